@@ -1,13 +1,30 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
+from flask_compress import Compress
 import os
+import hashlib
+import itertools
+import math
+import tempfile
 import threading
 import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from werkzeug.exceptions import NotFound
 from werkzeug.utils import secure_filename
-from physics_engine import PhysicsEngine
-from educational_physics_engine import EducationalPhysicsEngine
-from tracking_video_generator import process_video_with_tracking
-from data_cleaner import DataCleaner
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain NumPy reductions
+    njit = None
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
@@ -15,8 +32,35 @@ CORS(app)  # Enable CORS for React frontend
 # Configuration
 app.config['UPLOAD_FOLDER'] = 'assets'
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 512
+
+# Compress JSON responses (the frontend polls /status); images and videos are left as-is
+Compress(app)
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB copy buffer for uploads
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+# Output directories (absolute: send_from_directory resolves relative paths against app.root_path)
+VIDEOS_FOLDER = os.path.abspath(os.path.join('static', 'videos'))
+PLOTS_FOLDER = os.path.abspath(os.path.join('static', 'plots'))
+
+# Single background worker for video processing jobs
+executor = ThreadPoolExecutor(max_workers=1)
+
+# Per-job processing status, keyed by job id in start order
+JOBS = OrderedDict()
+_jobs_lock = threading.Lock()
 
-# Global processing status
+# Finished jobs kept for /status/<job_id>; older ones are evicted along with their results
+MAX_FINISHED_JOBS = 16
+FINISHED_STATES = ("completed", "error")
+
+# Status versions (bumped on every update, served as the /status ETag)
+STATUS_VERSIONS = {}
+_status_version = itertools.count(1)
+
+# Status of the most recently started job (served by /status)
 processing_status = {
     "status": "idle",
     "progress": 0,
@@ -35,77 +79,130 @@ educational_data = None
 # Global motion explanation
 motion_explanation = None
 
-def convert_numpy_types(obj):
-    """Convert NumPy types to Python types for JSON serialization"""
-    import numpy as np
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {key: convert_numpy_types(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(item) for item in obj]
-    else:
-        return obj
+def _json(obj):
+    """Serialize results (including NumPy scalars/arrays) straight to a JSON response"""
+    return app.response_class(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS),
+        mimetype='application/json'
+    )
+
+def _motion_stats_loop(vx, vy, y):
+    """Single pass over the velocity/height columns (NaNs skipped like pandas).
+
+    Returns (max_speed, vx_std, vx_mean_abs, vy_min, vy_max, y_min, y_max).
+    """
+    max_speed = -math.inf
+    vy_min = math.inf
+    vy_max = -math.inf
+    count = 0
+    vx_mean = 0.0
+    vx_m2 = 0.0
+    for i in range(vx.shape[0]):
+        a = vx[i]
+        b = vy[i]
+        if a == a and b == b:
+            speed = math.sqrt(a * a + b * b)
+            if speed > max_speed:
+                max_speed = speed
+        if a == a:
+            # Welford update for the vx mean/variance
+            count += 1
+            delta = a - vx_mean
+            vx_mean += delta / count
+            vx_m2 += delta * (a - vx_mean)
+        if b == b:
+            if b < vy_min:
+                vy_min = b
+            if b > vy_max:
+                vy_max = b
+    y_min = math.inf
+    y_max = -math.inf
+    for i in range(y.shape[0]):
+        h = y[i]
+        if h == h:
+            if h < y_min:
+                y_min = h
+            if h > y_max:
+                y_max = h
+    vx_std = math.sqrt(vx_m2 / count) if count > 0 else math.nan
+    return max_speed, vx_std, abs(vx_mean), vy_min, vy_max, y_min, y_max
+
+def _motion_stats_numpy(vx, vy, y):
+    """NumPy equivalent of _motion_stats_loop, used when numba is unavailable"""
+    # Stack the columns once so min/max run as single column-wise reductions
+    cols = np.column_stack((vx, vy, np.hypot(vx, vy)) + ((y,) if y.size else ()))
+    col_min = np.nanmin(cols, axis=0)
+    col_max = np.nanmax(cols, axis=0)
+    y_min, y_max = (col_min[3], col_max[3]) if y.size else (math.inf, -math.inf)
+    return (col_max[2], np.nanstd(cols[:, 0]), abs(np.nanmean(cols[:, 0])),
+            col_min[1], col_max[1], y_min, y_max)
+
+# No fastmath: the NaN checks above must not be optimized away
+_motion_stats = njit(cache=True)(_motion_stats_loop) if njit else _motion_stats_numpy
+
+# Motion explanation templates ({color}/{type} are filled in per detected object)
+MOTION_EXPLANATION_TEMPLATES = {
+    'projectile_motion': """The {color} {type} is being thrown up into the air and experiences projectile motion. The {type} moves forward at a constant speed while gravity simultaneously pulls it downward, causing it to rise, reach a peak, then fall back down. These two motions combine to create the familiar arc-shaped trajectory you see whenever you throw any object through the air.""",
+    'constant_velocity': """The {color} {type} is moving at constant velocity. The {type} travels in a straight line at steady speed with no acceleration, demonstrating Newton's First Law where an object in motion stays in motion unless acted upon by an external force. This indicates that friction and air resistance are negligible, allowing the {type} to maintain its motion indefinitely.""",
+    'circular_motion': """The {color} {type} is following circular motion. The {type} moves in a curved path at constant speed but with continuously changing direction. This is caused by centripetal forces that pull the {type} toward the center of the circle, creating the circular path. The acceleration is always directed toward the center, changing the {type}'s direction without changing its speed.""",
+    'high_speed': """The {color} {type} is moving at high speed through the air. The {type} experiences the combined effects of its initial velocity and gravity, with air resistance gradually slowing it down. As it travels, gravity continuously pulls it downward while air resistance opposes its motion, creating a curved path that becomes steeper over time.""",
+    'varying_motion': """The {color} {type} is moving with varying motion. The {type} shows changing velocity patterns as it moves, with its motion being influenced by gravity, friction, and other forces acting upon it. The acceleration changes indicate that multiple forces are interacting with the {type}, creating complex motion that demonstrates the interplay between different physical forces."""
+}
+
+# Detected object (type, color) pairs used by generate_motion_explanation
+MOTION_OBJECTS = (("ball", "yellow"), ("object", "tracked"))
+
+# Fully rendered explanations, keyed by (template, object_type, object_color)
+MOTION_EXPLANATIONS = {
+    (key, object_type, object_color): template.format(color=object_color, type=object_type)
+    for key, template in MOTION_EXPLANATION_TEMPLATES.items()
+    for object_type, object_color in MOTION_OBJECTS
+}
 
 def generate_motion_explanation(df, analysis):
     """Generate a simple motion explanation paragraph"""
-    import numpy as np
     
     if len(df) < 2:
         return "Insufficient data for motion analysis. Please ensure the video contains clear object movement."
     
     # Extract key metrics safely
     motion_type = analysis.get('motion_type', 'unknown')
-    duration = df['time_s'].max() - df['time_s'].min() if len(df) > 1 else 0
+    columns = frozenset(df.columns)
+    
+    # Reduce the velocity/height columns in one pass
+    has_velocity = 'velocity_x' in columns and 'velocity_y' in columns
+    if has_velocity:
+        vx = np.ascontiguousarray(df['velocity_x'].to_numpy(dtype=np.float64))
+        vy = np.ascontiguousarray(df['velocity_y'].to_numpy(dtype=np.float64))
+        y = np.ascontiguousarray(df['y_m'].to_numpy(dtype=np.float64)) if 'y_m' in columns else np.empty(0)
+        max_speed, vx_std, vx_mean, vy_min, vy_max, y_min, y_max = _motion_stats(vx, vy, y)
     
     # Safely get velocity metrics
-    if 'speed' in df.columns:
-        max_velocity = df['speed'].max()
-    elif 'velocity_x' in df.columns and 'velocity_y' in df.columns:
-        # Calculate speed from velocity components
-        speed = np.sqrt(df['velocity_x']**2 + df['velocity_y']**2)
-        max_velocity = speed.max()
+    if 'speed' in columns:
+        max_velocity = np.nanmax(df['speed'].to_numpy(dtype=np.float64))
+    elif has_velocity:
+        max_velocity = max_speed
     else:
         max_velocity = 0
     
-    # Safely get acceleration metrics
-    if 'acceleration_magnitude' in df.columns:
-        max_acceleration = df['acceleration_magnitude'].max()
-    elif 'acceleration_x' in df.columns and 'acceleration_y' in df.columns:
-        # Calculate acceleration magnitude from components
-        accel_mag = np.sqrt(df['acceleration_x']**2 + df['acceleration_y']**2)
-        max_acceleration = accel_mag.max()
-    else:
-        max_acceleration = 0
-    
     # Determine object type and color (simplified detection)
     if max_velocity > 20:
-        object_type = "ball"
-        object_color = "yellow"  # Default assumption for now
+        object_type, object_color = MOTION_OBJECTS[0]  # Yellow ball: default assumption for now
     else:
-        object_type = "object"
-        object_color = "tracked"
+        object_type, object_color = MOTION_OBJECTS[1]
     
     # Analyze velocity and acceleration patterns for more specific descriptions
-    if 'velocity_x' in df.columns and 'velocity_y' in df.columns:
+    if has_velocity:
         # Check if horizontal velocity is roughly constant (projectile motion)
-        vx_std = np.std(df['velocity_x'])
-        vx_mean = np.abs(np.mean(df['velocity_x']))
         horizontal_constant = vx_std / vx_mean < 0.4 if vx_mean > 0.1 else False
         
         # Check if vertical velocity is changing (due to gravity)
-        vy_change = np.max(df['velocity_y']) - np.min(df['velocity_y'])
+        vy_change = vy_max - vy_min
         vertical_acceleration = vy_change > 3  # Significant change in vertical velocity
         
         # Check if there's a clear trajectory (height changes significantly)
-        if 'y_m' in df.columns:
-            height_change = np.max(df['y_m']) - np.min(df['y_m'])
+        if 'y_m' in columns:
+            height_change = y_max - y_min
             has_trajectory = height_change > 2  # Significant height change
         else:
             has_trajectory = False
@@ -114,75 +211,131 @@ def generate_motion_explanation(df, analysis):
         vertical_acceleration = False
         has_trajectory = False
     
-    # Generate detailed physics explanations based on motion type and patterns
+    # Pick the explanation matching the motion type and patterns
     if motion_type == 'projectile_motion' or (horizontal_constant and vertical_acceleration and has_trajectory):
-        return f"""The {object_color} {object_type} is being thrown up into the air and experiences projectile motion. The {object_type} moves forward at a constant speed while gravity simultaneously pulls it downward, causing it to rise, reach a peak, then fall back down. These two motions combine to create the familiar arc-shaped trajectory you see whenever you throw any object through the air."""
-    
+        key = 'projectile_motion'
     elif motion_type == 'constant_velocity':
-        return f"""The {object_color} {object_type} is moving at constant velocity. The {object_type} travels in a straight line at steady speed with no acceleration, demonstrating Newton's First Law where an object in motion stays in motion unless acted upon by an external force. This indicates that friction and air resistance are negligible, allowing the {object_type} to maintain its motion indefinitely."""
-    
+        key = 'constant_velocity'
     elif motion_type == 'circular_motion':
-        return f"""The {object_color} {object_type} is following circular motion. The {object_type} moves in a curved path at constant speed but with continuously changing direction. This is caused by centripetal forces that pull the {object_type} toward the center of the circle, creating the circular path. The acceleration is always directed toward the center, changing the {object_type}'s direction without changing its speed."""
-    
+        key = 'circular_motion'
     elif max_velocity > 30 and has_trajectory:
-        return f"""The {object_color} {object_type} is being thrown up into the air and experiences projectile motion. The {object_type} moves forward at a constant speed while gravity simultaneously pulls it downward, causing it to rise, reach a peak, then fall back down. These two motions combine to create the familiar arc-shaped trajectory you see whenever you throw any object through the air."""
-    
+        key = 'projectile_motion'
     elif max_velocity > 15:
-        return f"""The {object_color} {object_type} is moving at high speed through the air. The {object_type} experiences the combined effects of its initial velocity and gravity, with air resistance gradually slowing it down. As it travels, gravity continuously pulls it downward while air resistance opposes its motion, creating a curved path that becomes steeper over time."""
+        key = 'high_speed'
+    else:
+        key = 'varying_motion'
     
+    return MOTION_EXPLANATIONS[key, object_type, object_color]
+
+def update_status(job_id, changes):
+    """Apply changes to a job's status and bump its version"""
+    with _jobs_lock:
+        JOBS[job_id].update(changes)
+        STATUS_VERSIONS[job_id] = next(_status_version)
+        if changes.get("status") in FINISHED_STATES:
+            _evict_finished_jobs()
+
+def _evict_finished_jobs():
+    """Drop the oldest finished jobs beyond MAX_FINISHED_JOBS (caller holds _jobs_lock)"""
+    finished = [job_id for job_id, job in JOBS.items() if job["status"] in FINISHED_STATES]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del JOBS[job_id]
+        STATUS_VERSIONS.pop(job_id, None)
+
+def _status_response(status):
+    """JSON status response with a version ETag; 304 if the client already has it"""
+    job_id = status.get("job_id")
+    etag = f"{job_id or 'idle'}-{STATUS_VERSIONS.get(job_id, 0)}"
+    # Flask-Compress suffixes the ETag of compressed responses with the algorithm
+    if any(request.if_none_match.contains(tag)
+           for tag in [etag] + [f"{etag}:{algo}" for algo in app.config['COMPRESS_ALGORITHM']]):
+        response = app.response_class(status=304)
     else:
-        return f"""The {object_color} {object_type} is moving with varying motion. The {object_type} shows changing velocity patterns as it moves, with its motion being influenced by gravity, friction, and other forces acting upon it. The acceleration changes indicate that multiple forces are interacting with the {object_type}, creating complex motion that demonstrates the interplay between different physical forces."""
+        response = _json(status)
+    response.set_etag(etag)
+    return response
 
-def process_video_background(video_path):
-    """Process video in background thread"""
+def start_job(video_path):
+    """Register a new processing job and queue it on the background worker"""
     global processing_status
-    
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        processing_status = JOBS[job_id] = {
+            "job_id": job_id,
+            "status": "processing",
+            "progress": 0,
+            "message": "Starting video processing...",
+            "data_points": 0,
+            "plots": {},
+            "trajectory_analysis": {},
+            "physics_insights": {},
+            "csv_file": None,
+            "tracking_video": None
+        }
+        STATUS_VERSIONS[job_id] = next(_status_version)
+    executor.submit(process_video_background, video_path, job_id)
+    return job_id
+
+def process_video_background(video_path, job_id):
+    """Process video in background thread"""
     try:
-        processing_status["status"] = "processing"
-        processing_status["progress"] = 10
-        processing_status["message"] = "Loading video..."
-        
-        # Always regenerate tracking video with new vector visualization
-        video_name = os.path.basename(video_path)
-        processing_status["progress"] = 20
-        processing_status["message"] = "Running AI object detection with force vectors..."
-        
-        # Generate new tracking video with physics vectors
-        csv_path, tracking_video_path = process_video_with_tracking(video_path)
-        print(f"✅ Tracking video with force vectors generated: {os.path.basename(tracking_video_path)}")
+        # Heavy modules (OpenCV, ultralytics, matplotlib) are only loaded once a job runs; an
+        # import failure is reported through the job status like any other processing error
+        from physics_engine import PhysicsEngine
+        from educational_physics_engine import EducationalPhysicsEngine, METRIC_COLUMNS, MOMENTUM_COLUMNS
+        from tracking_video_generator import process_video_with_tracking
+        from data_cleaner import DataCleaner
         
-        processing_status["progress"] = 60
-        processing_status["message"] = "Analyzing physics..."
+        update_status(job_id, {"status": "processing", "progress": 10, "message": "Loading video..."})
         
-        # Load tracking data
-        import pandas as pd
-        df = pd.read_csv(csv_path)
-        
-        # Clean the data to remove outliers
-        processing_status["progress"] = 50
-        processing_status["message"] = "Cleaning data and removing outliers..."
-        
-        data_cleaner = DataCleaner(
-            max_gap=1,
-            k_speed=4.0,
-            k_back=3.5,
-            back_min=15.0,
-            cx_tol=8.0,
-            k_resid=3.5,
-            trim_passes=3,
-            invert=False
-        )
-        
-        df_cleaned, cleaning_stats = data_cleaner.clean_all_tracks(df)
-        
-        # Save cleaned data
-        cleaned_csv_path = csv_path.replace('.csv', '_cleaned.csv')
-        df_cleaned.to_csv(cleaned_csv_path, index=False)
-        
-        print(f"✅ Data cleaning complete: {len(df)} → {len(df_cleaned)} points ({cleaning_stats.get('cleaning_percentage', 0):.1f}% outliers removed)")
+        video_name = os.path.basename(video_path)
+        cached_tracking_video = os.path.join(VIDEOS_FOLDER, f"tracked_{video_name}")
+        cached_parquet = os.path.join(VIDEOS_FOLDER, f"cleaned_{os.path.splitext(video_name)[0]}.parquet")
         
-        # Use cleaned data for analysis
-        df = df_cleaned
+        if os.path.exists(cached_tracking_video) and os.path.exists(cached_parquet):
+            # Reuse the tracking video and cleaned data from a previous run
+            tracking_video_path = cached_tracking_video
+            csv_path = None
+            cleaned_csv_path = None
+            cleaning_stats = {}
+            df = pq.read_table(cached_parquet).to_pandas()
+            print(f"✅ Reusing cached tracking data: {os.path.basename(cached_parquet)}")
+            
+            update_status(job_id, {"progress": 60, "message": "Analyzing physics..."})
+        else:
+            update_status(job_id, {"progress": 20, "message": "Running AI object detection with force vectors..."})
+            
+            # Generate new tracking video with physics vectors
+            csv_path, tracking_video_path, df = process_video_with_tracking(video_path)
+            print(f"✅ Tracking video with force vectors generated: {os.path.basename(tracking_video_path)}")
+            
+            update_status(job_id, {"progress": 60, "message": "Analyzing physics..."})
+            
+            # Clean the data to remove outliers
+            update_status(job_id, {"progress": 50, "message": "Cleaning data and removing outliers..."})
+            
+            data_cleaner = DataCleaner(
+                max_gap=1,
+                k_speed=4.0,
+                k_back=3.5,
+                back_min=15.0,
+                cx_tol=8.0,
+                k_resid=3.5,
+                trim_passes=3,
+                invert=False
+            )
+            
+            df_cleaned, cleaning_stats = data_cleaner.clean_all_tracks(df)
+            
+            # Save cleaned data: CSV for download, Parquet as the reprocessing cache
+            cleaned_csv_path = csv_path.replace('.csv', '_cleaned.csv')
+            pacsv.write_csv(pa.Table.from_pandas(df_cleaned, preserve_index=False), cleaned_csv_path)
+            df_cleaned.to_parquet(cached_parquet, compression='zstd', index=False)
+            
+            print(f"✅ Data cleaning complete: {len(df)} → {len(df_cleaned)} points ({cleaning_stats.get('cleaning_percentage', 0):.1f}% outliers removed)")
+            
+            # Use cleaned data for analysis
+            df = df_cleaned
         
         # Check if we have enough data points for analysis
         if len(df) < 2:
@@ -198,8 +351,7 @@ def process_video_background(video_path):
             trajectory_analysis = physics_engine.analyze_trajectory(df)
             physics_insights = physics_engine.calculate_physics_insights(df)
             
-            processing_status["progress"] = 80
-            processing_status["message"] = "Generating visualizations..."
+            update_status(job_id, {"progress": 80, "message": "Generating visualizations..."})
             
             # Generate advanced physics plots
             advanced_plots = physics_engine.generate_advanced_plots(df)
@@ -207,8 +359,10 @@ def process_video_background(video_path):
             # Generate educational analysis
             global educational_data, motion_explanation
             educational_engine = EducationalPhysicsEngine(pixels_per_meter=50.0, object_mass=0.5)
-            # Calculate physics metrics first
-            df_enhanced = educational_engine.calculate_physics_metrics(df)
+            # Extend the already time-sorted physics DataFrame in place rather than
+            # re-sorting a copy; momentum isn't used by the educational analysis
+            educational_metrics = set(METRIC_COLUMNS).difference(MOMENTUM_COLUMNS)
+            df_enhanced = educational_engine.calculate_physics_metrics(df, needs=educational_metrics)
             educational_analysis = educational_engine.analyze_physics_concepts(df_enhanced)
             educational_explanations = educational_engine.generate_educational_explanations(df_enhanced, educational_analysis)
             educational_quiz = educational_engine.create_learning_quiz(df_enhanced, educational_analysis)
@@ -226,10 +380,10 @@ def process_video_background(video_path):
         
         # Update status with results
         tracking_video_name = os.path.basename(tracking_video_path)
-        csv_filename = os.path.basename(csv_path)
-        cleaned_csv_filename = os.path.basename(cleaned_csv_path) if 'cleaned_csv_path' in locals() else None
+        csv_filename = os.path.basename(csv_path) if csv_path else None
+        cleaned_csv_filename = os.path.basename(cleaned_csv_path) if cleaned_csv_path else None
         
-        processing_status.update({
+        update_status(job_id, {
             "status": "completed",
             "progress": 100,
             "message": f"Processing complete! {len(df)} data points generated.",
@@ -237,21 +391,20 @@ def process_video_background(video_path):
             "cleaned_csv_file": cleaned_csv_filename,
             "plots": advanced_plots,
             "data_points": len(df),
-            "trajectory_analysis": convert_numpy_types(trajectory_analysis),
-            "physics_insights": convert_numpy_types(physics_insights),
+            "trajectory_analysis": trajectory_analysis,
+            "physics_insights": physics_insights,
             "tracking_video": f"videos/{tracking_video_name}",
             "duration": len(df) / 30.0 if len(df) > 0 else 0,  # Estimate duration
             "objects_tracked": len(df['track_id'].unique()) if len(df) > 0 else 0,
-            "cleaning_stats": convert_numpy_types(cleaning_stats) if 'cleaning_stats' in locals() else {}
+            "cleaning_stats": cleaning_stats
         })
         
         print(f"✅ Processing complete: {len(df)} data points, {len(advanced_plots)} plots")
         
     except Exception as e:
         print(f"❌ Processing error: {e}")
-        import traceback
         traceback.print_exc()
-        processing_status.update({
+        update_status(job_id, {
             "status": "error",
             "message": f"Processing failed: {str(e)}"
         })
@@ -268,17 +421,32 @@ def index():
 @app.route('/status')
 def get_status():
     """Get current processing status"""
-    return jsonify(processing_status)
+    return _status_response(processing_status)
+
+@app.route('/status/<job_id>')
+def get_job_status(job_id):
+    """Get processing status for a specific job"""
+    status = JOBS.get(job_id)
+    if status is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return _status_response(status)
+
+@lru_cache(maxsize=1)
+def _scan_assets(folder, mtime_ns):
+    """List video files in folder (cached until the directory's mtime changes)"""
+    with os.scandir(folder) as entries:
+        return [entry.name for entry in entries
+                if entry.is_file() and entry.name.lower().endswith(VIDEO_EXTENSIONS)]
 
 @app.route('/assets')
 def list_assets():
     """List available video assets"""
-    assets = []
-    if os.path.exists(app.config['UPLOAD_FOLDER']):
-        for file in os.listdir(app.config['UPLOAD_FOLDER']):
-            if file.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')):
-                assets.append(file)
-    return jsonify(assets)
+    folder = app.config['UPLOAD_FOLDER']
+    try:
+        mtime_ns = os.stat(folder).st_mtime_ns
+    except FileNotFoundError:
+        return jsonify([])
+    return jsonify(_scan_assets(folder, mtime_ns))
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
@@ -291,110 +459,91 @@ def upload_file():
         return jsonify({'error': 'No file selected'}), 400
     
     if file:
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        upload_folder = app.config['UPLOAD_FOLDER']
+        extension = os.path.splitext(secure_filename(file.filename))[1].lower()
         
-        # Start processing the uploaded file
-        global processing_status
-        processing_status = {
-            "status": "processing",
-            "progress": 0,
-            "message": "Starting video processing...",
-            "data_points": 0,
-            "physics_insights": {},
-            "plots": {},
-            "trajectory_analysis": {},
-            "tracking_video": None,
-            "csv_file": None
-        }
+        # Copy the spooled upload to disk in 1 MiB chunks, hashing it on the way
+        digest = hashlib.sha256()
+        dst = tempfile.NamedTemporaryFile('wb', dir=upload_folder, suffix='.part', delete=False)
+        try:
+            with dst:
+                for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    dst.write(chunk)
+            
+            # Store by content hash so re-uploads reuse the cached tracking results
+            filename = f"{digest.hexdigest()}{extension}"
+            filepath = os.path.join(upload_folder, filename)
+            if os.path.exists(filepath):
+                os.remove(dst.name)
+            else:
+                os.replace(dst.name, filepath)
+        except BaseException:
+            # Don't leave a half-written .part file behind in uploads/
+            try:
+                os.remove(dst.name)
+            except FileNotFoundError:
+                pass
+            raise
         
         # Start background processing
-        thread = threading.Thread(target=process_video_background, args=(filepath,))
-        thread.daemon = True
-        thread.start()
+        job_id = start_job(filepath)
         
-        return jsonify({'filename': filename, 'path': filepath, 'message': 'Upload successful, processing started'})
+        return jsonify({'job_id': job_id, 'filename': filename, 'original_filename': file.filename,
+                        'path': filepath, 'message': 'Upload successful, processing started'})
 
 @app.route('/process_asset/<filename>')
 def process_asset(filename):
     """Process a specific asset file"""
-    global processing_status
-    
     video_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
     if not os.path.exists(video_path):
         return jsonify({'error': 'File not found'}), 404
     
-    # Reset processing status
-    processing_status = {
-        "status": "processing",
-        "progress": 0,
-        "message": "Starting video processing...",
-        "data_points": 0,
-        "plots": {},
-        "trajectory_analysis": {},
-        "physics_insights": {},
-        "csv_file": None,
-        "tracking_video": None
-    }
-    
     # Start processing in background
-    thread = threading.Thread(target=process_video_background, args=(video_path,))
-    thread.daemon = True
-    thread.start()
+    job_id = start_job(video_path)
     
-    return jsonify({'message': 'Processing started', 'filename': filename})
+    return jsonify({'job_id': job_id, 'message': 'Processing started', 'filename': filename})
+
+def _send_file(folder, filename, **kwargs):
+    """send_from_directory, with a JSON 404 when the file is missing"""
+    try:
+        return send_from_directory(folder, filename, **kwargs)
+    except NotFound:
+        return jsonify({'error': 'File not found'}), 404
 
 @app.route('/download/<filename>')
 def download_file(filename):
     """Download a file"""
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    if os.path.exists(file_path):
-        return send_file(file_path, as_attachment=True)
-    else:
-        return jsonify({'error': 'File not found'}), 404
+    return _send_file(os.path.abspath(app.config['UPLOAD_FOLDER']), filename,
+                      as_attachment=True, conditional=True)
 
 @app.route('/download_cleaned/<filename>')
 def download_cleaned_file(filename):
     """Download cleaned CSV data"""
     # Look for cleaned version first
     cleaned_filename = filename.replace('.csv', '_cleaned.csv')
-    cleaned_path = os.path.join('static', 'videos', cleaned_filename)
-    
-    if os.path.exists(cleaned_path):
-        return send_file(cleaned_path, as_attachment=True)
-    else:
+    try:
+        return send_from_directory(VIDEOS_FOLDER, cleaned_filename, as_attachment=True, conditional=True)
+    except NotFound:
         # Fallback to original file
-        original_path = os.path.join('static', 'videos', filename)
-        if os.path.exists(original_path):
-            return send_file(original_path, as_attachment=True)
-        else:
-            return jsonify({'error': 'File not found'}), 404
+        return _send_file(VIDEOS_FOLDER, filename, as_attachment=True, conditional=True)
 
 @app.route('/videos/<filename>')
 def serve_video(filename):
-    """Serve tracking videos"""
-    video_path = os.path.join('static', 'videos', filename)
-    if os.path.exists(video_path):
-        return send_file(video_path)
-    else:
-        return jsonify({'error': 'Video not found'}), 404
+    """Serve tracking videos (supports Range requests for seeking)"""
+    return _send_file(VIDEOS_FOLDER, filename, conditional=True, mimetype='video/mp4')
 
 @app.route('/plots/<filename>')
 def serve_plot(filename):
     """Serve plot images"""
-    plot_path = os.path.join('static', 'plots', filename)
-    if os.path.exists(plot_path):
-        return send_file(plot_path)
-    else:
-        return jsonify({'error': 'Plot not found'}), 404
+    return _send_file(PLOTS_FOLDER, filename, conditional=True)
 
 @app.route('/educational_analysis')
 def get_educational_analysis():
     """Get educational analysis data"""
     global educational_data
     if educational_data:
-        return jsonify(convert_numpy_types(educational_data))
+        return _json(educational_data)
     else:
         return jsonify({'error': 'No educational analysis available'}), 404
 
@@ -417,4 +566,10 @@ if __name__ == '__main__':
     print("📡 API will be available at: http://localhost:8000")
     print("🌐 CORS enabled for React frontend")
     
-    app.run(debug=True, host='0.0.0.0', port=8000)
\ No newline at end of file
+    if os.getenv('FLASK_DEV'):
+        # Werkzeug debug server with auto-reload
+        app.run(debug=True, host='0.0.0.0', port=8000)
+    else:
+        # Multi-threaded WSGI server so /status polls don't queue behind file transfers
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=8000, threads=8)
\ No newline at end of file
@@ -1,7 +1,104 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to np.polyfit trimming
+    njit = None
+
+
+def _quadratic_fit(x, y, alive):
+    """Least-squares y = a*x^2 + b*x + c over the alive points (normal equations on centred x)"""
+    m = 0
+    mean = 0.0
+    for i in range(x.shape[0]):
+        if alive[i]:
+            m += 1
+            mean += x[i]
+    mean /= m
+    scale = 0.0
+    for i in range(x.shape[0]):
+        if alive[i] and abs(x[i] - mean) > scale:
+            scale = abs(x[i] - mean)
+    if scale == 0.0:
+        scale = 1.0
+    
+    s0 = float(m)
+    s1 = s2 = s3 = s4 = 0.0
+    t0 = t1 = t2 = 0.0
+    for i in range(x.shape[0]):
+        if alive[i]:
+            u = (x[i] - mean) / scale
+            u2 = u * u
+            s1 += u
+            s2 += u2
+            s3 += u2 * u
+            s4 += u2 * u2
+            t0 += y[i]
+            t1 += u * y[i]
+            t2 += u2 * y[i]
+    
+    # Solve [[s4, s3, s2], [s3, s2, s1], [s2, s1, s0]] @ [a, b, c] = [t2, t1, t0] by Cramer's rule
+    coef = np.empty(3)
+    det = s4 * (s2 * s0 - s1 * s1) - s3 * (s3 * s0 - s1 * s2) + s2 * (s3 * s1 - s2 * s2)
+    if det == 0.0:
+        coef[:] = np.nan
+        return coef
+    a = (t2 * (s2 * s0 - s1 * s1) - s3 * (t1 * s0 - s1 * t0) + s2 * (t1 * s1 - s2 * t0)) / det
+    b = (s4 * (t1 * s0 - s1 * t0) - t2 * (s3 * s0 - s1 * s2) + s2 * (s3 * t0 - t1 * s2)) / det
+    c = (s4 * (s2 * t0 - t1 * s1) - s3 * (s3 * t0 - t1 * s2) + t2 * (s3 * s1 - s2 * s2)) / det
+    
+    # Back to polynomial coefficients in x (highest power first, like np.polyfit)
+    coef[0] = a / (scale * scale)
+    coef[1] = b / scale - 2.0 * a * mean / (scale * scale)
+    coef[2] = a * mean * mean / (scale * scale) - b * mean / scale + c
+    return coef
+
+
+def _mad_sigma(v):
+    """Kernel version of DataCleaner.mad_sigma"""
+    v = v[np.isfinite(v)]
+    if v.size == 0:
+        return 1.0
+    med = np.median(v)
+    mad = np.median(np.abs(v - med))
+    if mad > 0:
+        return 1.4826 * mad
+    return np.std(v) if v.size > 1 else 1.0
+
+
+def _trim_quadratic(cx, cy, alive, k_resid, passes):
+    """Iterative residual trimming around a quadratic fit; updates alive in place, returns coef"""
+    coef = _quadratic_fit(cx, cy, alive)
+    for _ in range(passes):
+        idx = np.flatnonzero(alive)
+        res = np.empty(idx.size)
+        for j in range(idx.size):
+            x = cx[idx[j]]
+            res[j] = cy[idx[j]] - ((coef[0] * x + coef[1]) * x + coef[2])
+        thr_res = max(3.0, k_resid * _mad_sigma(res))
+        kept = 0
+        for j in range(idx.size):
+            if abs(res[j]) <= thr_res:
+                kept += 1
+        if kept < 3 or kept == idx.size:
+            break
+        for j in range(idx.size):
+            if not abs(res[j]) <= thr_res:
+                alive[idx[j]] = False
+        coef = _quadratic_fit(cx, cy, alive)
+    return coef
+
+
+# No fastmath: the isfinite filter in _mad_sigma must not be optimized away.
+# nogil lets clean_all_tracks' worker threads run the kernel on several cores at once.
+if njit is not None:
+    _quadratic_fit = njit(cache=True, nogil=True)(_quadratic_fit)
+    _mad_sigma = njit(cache=True, nogil=True)(_mad_sigma)
+    _trim_quadratic = njit(cache=True, nogil=True)(_trim_quadratic)
+
 
 class DataCleaner:
     """
@@ -17,7 +114,8 @@ class DataCleaner:
                  cx_tol=8.0,          # px; allow small non-monotone wiggles in cx
                  k_resid=3.5,         # residual MAD multiplier (iterative trimming)
                  trim_passes=3,       # number of iterative trimming passes
-                 invert=False):       # set True to flip inliers/outliers
+                 invert=False,        # set True to flip inliers/outliers
+                 max_workers=8):      # threads used to clean tracks in parallel
         self.max_gap = max_gap
         self.k_speed = k_speed
         self.k_back = k_back
@@ -26,6 +124,7 @@ class DataCleaner:
         self.k_resid = k_resid
         self.trim_passes = trim_passes
         self.invert = invert
+        self.max_workers = max_workers
     
     def mad_sigma(self, v):
         """Calculate robust standard deviation using Median Absolute Deviation"""
@@ -46,6 +145,25 @@ class DataCleaner:
         i = np.argmax(ends - starts)
         return starts[i], ends[i]   # half-open [s,e)
     
+    def trim_residuals(self, cx, cy, alive):
+        """Iteratively trim residual outliers around a quadratic fit (updates alive in place)"""
+        # Fit in float64: the quadratic Vandermonde system is badly conditioned in float32
+        cx, cy = cx.astype(np.float64), cy.astype(np.float64)
+        cx_cln, cy_cln = cx[alive], cy[alive]
+        coef = np.polyfit(cx_cln, cy_cln, 2)
+        for _ in range(self.trim_passes):
+            yhat = np.polyval(coef, cx_cln)
+            res = cy_cln - yhat
+            sig = self.mad_sigma(res)
+            thr_res = max(3.0, self.k_resid * sig)
+            mask = np.abs(res) <= thr_res
+            if mask.sum() < 3 or mask.all():
+                break
+            alive[np.flatnonzero(alive)[~mask]] = False
+            cx_cln, cy_cln = cx[alive], cy[alive]
+            coef = np.polyfit(cx_cln, cy_cln, 2)
+        return coef
+    
     def clean_tracking_data(self, df, target_track=None):
         """
         Clean tracking data by removing outliers and noise.
@@ -61,31 +179,27 @@ class DataCleaner:
         if len(df) < 3:
             return df, {"error": "Not enough data points for cleaning"}
         
-        # Filter by target track if specified
-        if target_track is not None:
-            df = df[df['track_id'] == target_track].copy()
+        # Filter by target track if specified (skipped when df is already that track's group)
+        if target_track is not None and not (df['track_id'] == target_track).all():
+            df = df[df['track_id'] == target_track]
             if len(df) < 3:
                 return df, {"error": f"Not enough data points for track {target_track}"}
         
-        # Extract basic data
-        frames = df['frame'].values.astype(int)
-        cx_all = df['cx'].values
-        cy_all = df['cy'].values
-        
-        # Collapse duplicate frames by median
-        uniq = np.unique(frames)
-        cx_med = np.array([np.median(cx_all[frames == f]) for f in uniq])
-        cy_med = np.array([np.median(cy_all[frames == f]) for f in uniq])
-        frames, cx_all, cy_all = uniq, cx_med, cy_med
+        # Collapse duplicate frames by median (one grouped reduction, sorted by frame)
+        grouped = df.groupby(df['frame'].astype(int), sort=True)[['cx', 'cy']].median()
+        frames = grouped.index.to_numpy()
+        cx_all = grouped['cx'].to_numpy()
+        cy_all = grouped['cy'].to_numpy()
         
         if len(frames) < 3:
             return df, {"error": "Not enough points after filtering/grouping"}
         
         # Keep longest contiguous run
         s, e = self.longest_contiguous_segment(frames, self.max_gap)
-        frames = frames[s:e]
-        cx = cx_all[s:e]
-        cy = cy_all[s:e]
+        frames = frames[s:e].astype(np.int32)
+        # float32 is ample at pixel scale and halves the bytes the pruning passes stream through
+        cx = np.ascontiguousarray(cx_all[s:e], dtype=np.float32)
+        cy = np.ascontiguousarray(cy_all[s:e], dtype=np.float32)
         n = len(frames)
         
         # Timeline-based pruning
@@ -99,61 +213,45 @@ class DataCleaner:
         keep = np.ones(n, dtype=bool)
         
         # (A) Teleport speeds: mark point i if adjacent speed is huge
-        for i in range(n):
-            if (i-1 >= 0 and speed[i-1] > thr_speed) or (i < n-1 and speed[i] > thr_speed):
-                keep[i] = False
+        too_fast = speed > thr_speed
+        keep[1:] &= ~too_fast
+        keep[:-1] &= ~too_fast
         
         # (B) Back-jumps in cx: if dx[i] is very negative, drop the later point (i+1)
-        for i in range(n-1):
-            if dx[i] < -thr_back:
-                keep[i+1] = False
-        
-        # (C) Near-monotone cx with tolerance
-        run_max = -np.inf
-        for i in range(n):
-            if cx[i] + self.cx_tol < run_max:
-                keep[i] = False
-            else:
-                run_max = max(run_max, cx[i])
+        keep[1:] &= ~(dx < -thr_back)
+        
+        # (C) Near-monotone cx with tolerance (running max of the preceding points)
+        run_max = np.r_[-np.inf, np.fmax.accumulate(cx)[:-1]]
+        keep &= ~(cx + self.cx_tol < run_max)
         
-        # Seed cleaned arrays
-        cx_cln = cx[keep]
-        cy_cln = cy[keep]
-        if len(cx_cln) < 3:
-            cx_cln, cy_cln = cx.copy(), cy.copy()
+        # Seed the surviving-point mask over the segment
+        alive = keep.copy() if keep.sum() >= 3 else np.ones(n, dtype=bool)
         
         # Iterative residual trimming (robust quadratic)
-        coef = np.polyfit(cx_cln, cy_cln, 2)
-        for _ in range(self.trim_passes):
-            yhat = np.polyval(coef, cx_cln)
-            res = cy_cln - yhat
-            sig = self.mad_sigma(res)
-            thr_res = max(3.0, self.k_resid * sig)
-            mask = np.abs(res) <= thr_res
-            if mask.sum() < 3 or mask.all():
-                break
-            cx_cln, cy_cln = cx_cln[mask], cy_cln[mask]
-            coef = np.polyfit(cx_cln, cy_cln, 2)
+        coef = None
+        if njit is not None:
+            trimmed = alive.copy()
+            coef = _trim_quadratic(np.ascontiguousarray(cx, dtype=np.float64),
+                                   np.ascontiguousarray(cy, dtype=np.float64),
+                                   trimmed, float(self.k_resid), int(self.trim_passes))
+            if np.all(np.isfinite(coef)):
+                alive = trimmed
+            else:
+                coef = None  # degenerate fit; let np.polyfit handle it
+        if coef is None:
+            coef = self.trim_residuals(cx, cy, alive)
+        cx_cln, cy_cln = cx[alive].astype(np.float64), cy[alive].astype(np.float64)
         
-        # Build keep_full over the segment
-        cln_set = set(map(tuple, np.round(np.column_stack([cx_cln, cy_cln]), 6)))
-        keep_full = np.array([(round(cx[i], 6), round(cy[i], 6)) in cln_set for i in range(n)])
+        keep_full = alive
         
         # Optionally invert inliers/outliers
         final_inliers = ~keep_full if self.invert else keep_full
         final_outliers = ~final_inliers
         
-        # Create cleaned DataFrame
-        cleaned_indices = []
-        for i, frame in enumerate(frames):
-            if final_inliers[i]:
-                # Find original row(s) for this frame
-                original_rows = df[df['frame'] == frame]
-                if len(original_rows) > 0:
-                    # Take the first row (or could take median)
-                    cleaned_indices.append(original_rows.index[0])
-        
-        cleaned_df = df.loc[cleaned_indices].copy() if cleaned_indices else df.copy()
+        # Create cleaned DataFrame: first original row of each inlier frame, in frame order
+        inlier_rows = df[df['frame'].isin(frames[final_inliers])]
+        cleaned_df = inlier_rows.drop_duplicates(subset='frame', keep='first').sort_values('frame', kind='stable')
+        cleaned_df = cleaned_df.copy() if len(cleaned_df) else df.copy()
         
         # Calculate cleaning statistics
         stats = {
@@ -161,8 +259,8 @@ class DataCleaner:
             "cleaned_points": len(cleaned_df),
             "outliers_removed": len(df) - len(cleaned_df),
             "cleaning_percentage": (len(df) - len(cleaned_df)) / len(df) * 100 if len(df) > 0 else 0,
-            "speed_threshold": thr_speed,
-            "back_jump_threshold": thr_back,
+            "speed_threshold": float(thr_speed),
+            "back_jump_threshold": float(thr_back),
             "quadratic_coefficients": coef.tolist() if len(cx_cln) >= 3 else None
         }
         
@@ -193,9 +291,19 @@ class DataCleaner:
         all_cleaned = []
         all_stats = {}
         
-        for track_id in df['track_id'].unique():
-            track_df = df[df['track_id'] == track_id].copy()
-            cleaned_track, stats = self.clean_tracking_data(track_df, target_track=track_id)
+        # Tracks are independent; clean them on a thread pool (NumPy releases the GIL)
+        tracks = list(df.groupby('track_id', sort=False))
+        def clean_track(track):
+            track_id, track_df = track
+            return self.clean_tracking_data(track_df, target_track=track_id)
+        
+        if len(tracks) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tracks))) as pool:
+                results = list(pool.map(clean_track, tracks))
+        else:
+            results = [clean_track(track) for track in tracks]
+        
+        for (track_id, _), (cleaned_track, stats) in zip(tracks, results):
             all_cleaned.append(cleaned_track)
             all_stats[f"track_{track_id}"] = stats
         
@@ -216,6 +324,11 @@ class DataCleaner:
             cleaned_df: cleaned DataFrame
             output_path: path to save the plot (optional)
         """
+        # Imported here so the cleaner itself doesn't pay matplotlib's startup cost
+        import matplotlib
+        matplotlib.use('Agg')  # Use non-interactive backend to avoid threading issues
+        import matplotlib.pyplot as plt
+        
         plt.figure(figsize=(12, 8))
         
         # Plot original data
@@ -1,21 +1,100 @@
 import cv2
 import numpy as np
 import pandas as pd
-from ultralytics import YOLO
+import math
 import os
+import queue
+import shutil
+import subprocess
+import threading
+from collections import deque, namedtuple
+from functools import lru_cache
+from itertools import groupby, islice
 from physics_engine import PhysicsEngine
 
-def create_tracking_video(input_video_path, output_video_path, data_csv_path):
+# Detection label font
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_SCALE = 0.6
+LABEL_THICKNESS = 2
+
+# Arrow heads: 15 px sides at 30 degrees to the shaft
+ARROW_HEAD_LENGTH = 15
+COS_ARROW_ANGLE = math.cos(math.pi / 6)
+SIN_ARROW_ANGLE = math.sin(math.pi / 6)
+
+# Velocity (m/s) handed to draw_physics_vectors
+PhysicsVec = namedtuple('PhysicsVec', ['vx', 'vy'])
+
+# Columns of the tracking CSV, in order
+TRACKING_COLUMNS = [
+    'frame', 'time_s', 'track_id', 'class_id', 'class_name', 'conf',
+    'x1', 'y1', 'x2', 'y2', 'cx', 'cy'
+]
+
+# Hardware H.264 encoders to try through FFmpeg, in order of preference
+HW_ENCODERS = ('h264_nvenc', 'h264_videotoolbox', 'h264_qsv')
+
+@lru_cache(maxsize=1)
+def find_hw_encoder():
+    """Return the first hardware H.264 encoder FFmpeg can initialise, or None"""
+    if shutil.which('ffmpeg') is None:
+        return None
+    for encoder in HW_ENCODERS:
+        probe = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-f', 'lavfi', '-i', 'color=size=256x256',
+             '-frames:v', '1', '-c:v', encoder, '-f', 'null', '-'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        if probe.returncode == 0:
+            return encoder
+    return None
+
+class FFmpegVideoWriter:
+    """Minimal cv2.VideoWriter stand-in that pipes raw BGR frames to an FFmpeg encoder"""
+    
+    def __init__(self, output_video_path, encoder, fps, size):
+        width, height = size
+        self.proc = subprocess.Popen(
+            ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+             '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+             '-c:v', encoder, '-b:v', '6M', '-pix_fmt', 'yuv420p', '-movflags', '+faststart',
+             output_video_path],
+            stdin=subprocess.PIPE
+        )
+    
+    def write(self, frame):
+        # Hand the pixel buffer to the pipe directly instead of copying it into bytes first
+        self.proc.stdin.write(memoryview(np.ascontiguousarray(frame)).cast('B'))
+    
+    def release(self):
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"FFmpeg exited with status {self.proc.returncode}")
+
+def open_video_writer(output_video_path, fps, width, height):
+    """Open an H.264 writer, using a hardware encoder via FFmpeg when one is available"""
+    encoder = find_hw_encoder()
+    if encoder is not None:
+        print(f"🎞️ Encoding with {encoder}")
+        return FFmpegVideoWriter(output_video_path, encoder, fps, (width, height))
+    
+    # Fall back to OpenCV's H.264 codec for better browser compatibility
+    fourcc = cv2.VideoWriter_fourcc(*'avc1')  # H.264 codec
+    return cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+
+def create_tracking_video(input_video_path, output_video_path, tracking_data):
     """
     Create a video with tracking visualization including:
     - Bounding boxes around detected objects
     - Trajectory trails
     - Force and velocity vectors
     - Frame counter and info
+    
+    tracking_data is the tracking DataFrame, or a path to its CSV.
     """
     
     # Load the tracking data
-    df = pd.read_csv(data_csv_path)
+    df = tracking_data if isinstance(tracking_data, pd.DataFrame) else pd.read_csv(tracking_data)
     
     # Calculate physics metrics for vector visualization
     physics_engine = PhysicsEngine(pixels_per_meter=50.0, object_mass=0.5)
@@ -27,125 +106,138 @@ def create_tracking_video(input_video_path, output_video_path, data_csv_path):
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     
-    # Create video writer with H.264 codec for better browser compatibility
-    fourcc = cv2.VideoWriter_fourcc(*'avc1')  # H.264 codec
-    out = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+    # Create H.264 video writer (hardware encoder when available)
+    out = open_video_writer(output_video_path, fps, width, height)
     
     frame_idx = 0
-    trajectory_points = []  # Store trajectory for drawing
+    trajectory_points = deque(maxlen=30)  # Store trajectory for drawing (last 30 points)
     
     print(f"Creating tracking video with force and velocity vectors...")
     
     # Create extrapolation data for missing frames
     extrapolated_data = create_extrapolation_data(df_physics)
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+    # Index detections by frame and physics rows by (frame, track) once, instead of
+    # filtering the full DataFrames on every video frame
+    frame_groups = {frame: group for frame, group in df.groupby('frame', sort=False)}
+    no_detections = df.iloc[0:0]
+    first_physics = df_physics.drop_duplicates(['frame', 'track_id'])
+    no_velocity = np.zeros(len(first_physics))
+    physics_rows = {
+        (frame, track_id): PhysicsVec(vx, vy)
+        for frame, track_id, vx, vy in zip(
+            first_physics['frame'].tolist(), first_physics['track_id'].tolist(),
+            first_physics['vx_m'].tolist() if 'vx_m' in first_physics else no_velocity.tolist(),
+            first_physics['vy_m'].tolist() if 'vy_m' in first_physics else no_velocity.tolist())
+    }
+    
+    # The legend is identical on every frame: render it once and copy it in
+    legend_y0, legend_y1, legend_x0, legend_x1, legend_patch, legend_mask = render_vector_legend(width, height)
+    
+    # Pipeline: decode and encode run on their own threads while this one draws
+    encode_queue, encoder = write_frames_async(out, maxsize=8)
+    
+    frames = prefetch_frames(cap, maxsize=8)
+    try:
+        for frame in frames:
+            frame_idx += 1
             
-        frame_idx += 1
-        
-        # Get tracking data for this frame
-        frame_data = df[df['frame'] == frame_idx]
-        frame_physics = df_physics[df_physics['frame'] == frame_idx]
-        
-        # Draw trajectory trail (last 30 frames)
-        if len(trajectory_points) > 30:
-            trajectory_points = trajectory_points[-30:]
-        
-        # Add current detections to trajectory
-        for _, row in frame_data.iterrows():
-            cx, cy = row['cx'], row['cy']
-            trajectory_points.append((int(cx), int(cy), int(row['track_id'])))
-        
-        # Draw trajectory trails
-        for i in range(len(trajectory_points) - 1):
-            pt1 = trajectory_points[i]
-            pt2 = trajectory_points[i + 1]
+            # Get tracking data for this frame
+            frame_data = frame_groups.get(frame_idx, no_detections)
             
-            # Only draw if same track ID
-            if pt1[2] == pt2[2]:
-                # Color based on track ID
-                color = get_track_color(pt1[2])
-                alpha = 0.3 + 0.7 * (i / len(trajectory_points))  # Fade effect
-                cv2.line(frame, (pt1[0], pt1[1]), (pt2[0], pt2[1]), color, 2)
-        
-        # Draw bounding boxes, labels, and vectors for detected objects
-        for _, row in frame_data.iterrows():
-            x1, y1, x2, y2 = int(row['x1']), int(row['y1']), int(row['x2']), int(row['y2'])
-            track_id = int(row['track_id'])
-            conf = row['conf']
-            class_name = row['class_name']
-            cx, cy = int(row['cx']), int(row['cy'])
+            # Add current detections to trajectory
+            for _, row in frame_data.iterrows():
+                cx, cy = row['cx'], row['cy']
+                trajectory_points.append((int(cx), int(cy), int(row['track_id'])))
             
-            # Get color for this track
-            color = get_track_color(track_id)
+            # Draw trajectory trails: one polyline per run of consecutive points from the same track
+            for track_id, run in groupby(trajectory_points, key=lambda point: point[2]):
+                pts = np.array([point[:2] for point in run], dtype=np.int32)
+                if len(pts) > 1:
+                    cv2.polylines(frame, [pts.reshape(-1, 1, 2)], False, get_track_color(track_id), 2)
             
-            # Draw bounding box
-            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            # Draw bounding boxes, labels, and vectors for detected objects
+            for _, row in frame_data.iterrows():
+                x1, y1, x2, y2 = int(row['x1']), int(row['y1']), int(row['x2']), int(row['y2'])
+                track_id = int(row['track_id'])
+                conf = row['conf']
+                class_name = row['class_name']
+                cx, cy = int(row['cx']), int(row['cy'])
+                
+                # Get color for this track
+                color = get_track_color(track_id)
+                
+                # Draw bounding box
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+                
+                # Draw label
+                label = f"ID:{track_id} {class_name} {conf:.2f}"
+                label_size = get_label_size(label)
+                cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
+                             (x1 + label_size[0], y1), color, -1)
+                cv2.putText(frame, label, (x1, y1 - 5), 
+                           LABEL_FONT, LABEL_SCALE, (255, 255, 255), LABEL_THICKNESS)
+                
+                # Draw force and velocity vectors
+                physics_row = physics_rows.get((frame_idx, track_id))
+                if physics_row is not None:
+                    draw_physics_vectors(frame, physics_row, cx, cy, fps)
             
-            # Draw label
-            label = f"ID:{track_id} {class_name} {conf:.2f}"
-            label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
-            cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
-                         (x1 + label_size[0], y1), color, -1)
-            cv2.putText(frame, label, (x1, y1 - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            # Draw extrapolated vectors for missing frames
+            if frame_idx in extrapolated_data:
+                for track_id, extrap_data in extrapolated_data[frame_idx].items():
+                    cx, cy = extrap_data['cx'], extrap_data['cy']
+                    physics_row = extrap_data['physics']
+                    draw_physics_vectors(frame, physics_row, int(cx), int(cy), fps)
             
-            # Draw force and velocity vectors
-            physics_row = frame_physics[frame_physics['track_id'] == track_id]
-            if not physics_row.empty:
-                physics_row = physics_row.iloc[0]
-                draw_physics_vectors(frame, physics_row, cx, cy, fps)
-        
-        # Draw extrapolated vectors for missing frames
-        if frame_idx in extrapolated_data:
-            for track_id, extrap_data in extrapolated_data[frame_idx].items():
-                cx, cy = extrap_data['cx'], extrap_data['cy']
-                physics_row = extrap_data['physics']
-                draw_physics_vectors(frame, physics_row, int(cx), int(cy), fps)
-        
-        # Add frame info overlay
-        info_text = f"Frame: {frame_idx} | Time: {frame_idx/fps:.2f}s"
-        cv2.putText(frame, info_text, (10, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        cv2.putText(frame, info_text, (10, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 1)
-        
-        # Add tracking count
-        track_count = len(frame_data)
-        count_text = f"Objects: {track_count}"
-        cv2.putText(frame, count_text, (10, 60), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        cv2.putText(frame, count_text, (10, 60), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 1)
-        
-        # Add vector legend
-        draw_vector_legend(frame, width, height)
-        
-        # Write frame to output video
-        out.write(frame)
-        
-        # Show progress
-        if frame_idx % 30 == 0:
-            print(f"Processed {frame_idx} frames...")
-    
-    cap.release()
-    out.release()
+            # Add frame info overlay
+            info_text = f"Frame: {frame_idx} | Time: {frame_idx/fps:.2f}s"
+            cv2.putText(frame, info_text, (10, 30), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            cv2.putText(frame, info_text, (10, 30), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 1)
+            
+            # Add tracking count
+            track_count = len(frame_data)
+            count_text = f"Objects: {track_count}"
+            cv2.putText(frame, count_text, (10, 60), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            cv2.putText(frame, count_text, (10, 60), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 1)
+            
+            # Add vector legend (stamped from the pre-rendered layer)
+            legend_roi = frame[legend_y0:legend_y1, legend_x0:legend_x1]
+            np.copyto(legend_roi, legend_patch, where=legend_mask)
+            
+            # Hand the frame to the encoder thread
+            encode_queue.put(frame)
+            
+            # Show progress
+            if frame_idx % 30 == 0:
+                print(f"Processed {frame_idx} frames...")
+    finally:
+        # Shut the pipeline down even if drawing fails: stop the reader, flush and join the
+        # encoder thread (which also ends FFmpeg's input), then release capture and writer
+        frames.close()
+        encode_queue.put(None)
+        encoder.join()
+        cap.release()
+        out.release()
+    if encoder.error is not None:
+        raise encoder.error
     print(f"Tracking video saved to: {output_video_path}")
 
 def draw_physics_vectors(frame, physics_row, cx, cy, fps):
     """
-    Draw separate force and velocity vectors on the frame
+    Draw separate force and velocity vectors on the frame (physics_row is a PhysicsVec)
     """
     # Much larger vector scaling factors for visibility
     velocity_scale = 8.0  # pixels per m/s (4x larger)
     force_scale = 15.0    # pixels per N (150x larger for gravity)
     
     # Get physics data
-    vx = physics_row.get('vx_m', 0)  # velocity x in m/s
-    vy = physics_row.get('vy_m', 0)  # velocity y in m/s
+    vx = physics_row.vx  # velocity x in m/s
+    vy = physics_row.vy  # velocity y in m/s
     mass = 0.5  # kg (assumed mass)
     
     # Convert to pixel coordinates
@@ -176,19 +268,20 @@ def draw_arrow(frame, start, end, color, thickness):
     # Draw main line
     cv2.line(frame, start, end, color, thickness)
     
-    # Calculate arrow head
-    angle = np.arctan2(end[1] - start[1], end[0] - start[0])
-    arrow_length = 15
-    arrow_angle = np.pi / 6  # 30 degrees
+    # Calculate arrow head from the unit direction (rotate it by +/-30 degrees)
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    length = math.hypot(dx, dy)
+    ux, uy = (dx / length, dy / length) if length > 0 else (1.0, 0.0)
     
     # Arrow head points
     head1 = (
-        int(end[0] - arrow_length * np.cos(angle - arrow_angle)),
-        int(end[1] - arrow_length * np.sin(angle - arrow_angle))
+        int(end[0] - ARROW_HEAD_LENGTH * (ux * COS_ARROW_ANGLE + uy * SIN_ARROW_ANGLE)),
+        int(end[1] - ARROW_HEAD_LENGTH * (uy * COS_ARROW_ANGLE - ux * SIN_ARROW_ANGLE))
     )
     head2 = (
-        int(end[0] - arrow_length * np.cos(angle + arrow_angle)),
-        int(end[1] - arrow_length * np.sin(angle + arrow_angle))
+        int(end[0] - ARROW_HEAD_LENGTH * (ux * COS_ARROW_ANGLE - uy * SIN_ARROW_ANGLE)),
+        int(end[1] - ARROW_HEAD_LENGTH * (uy * COS_ARROW_ANGLE + ux * SIN_ARROW_ANGLE))
     )
     
     # Draw arrow head
@@ -200,58 +293,35 @@ def create_extrapolation_data(df_physics):
     Create extrapolated position and physics data for missing frames
     """
     extrapolated_data = {}
+    columns = ['cx_m', 'cy_m', 'vx_m', 'vy_m']
     
-    # Get all unique track IDs
-    track_ids = df_physics['track_id'].unique()
-    
-    for track_id in track_ids:
-        track_data = df_physics[df_physics['track_id'] == track_id].sort_values('frame')
+    for track_id, track_data in df_physics.groupby('track_id', sort=False):
+        track_data = track_data.sort_values('frame')
         
         if len(track_data) < 2:
             continue
-            
-        # Get frame range
-        min_frame = track_data['frame'].min()
-        max_frame = track_data['frame'].max()
         
-        # Create interpolation for missing frames
-        for frame in range(min_frame, max_frame + 1):
-            if frame not in track_data['frame'].values:
-                # Find the two nearest frames for interpolation
-                before_frames = track_data[track_data['frame'] < frame]
-                after_frames = track_data[track_data['frame'] > frame]
-                
-                if len(before_frames) > 0 and len(after_frames) > 0:
-                    before_row = before_frames.iloc[-1]
-                    after_row = after_frames.iloc[0]
-                    
-                    # Linear interpolation
-                    t = (frame - before_row['frame']) / (after_row['frame'] - before_row['frame'])
-                    
-                    # Interpolate position
-                    cx = before_row['cx_m'] + t * (after_row['cx_m'] - before_row['cx_m'])
-                    cy = before_row['cy_m'] + t * (after_row['cy_m'] - before_row['cy_m'])
-                    
-                    # Interpolate velocity
-                    vx = before_row['vx_m'] + t * (after_row['vx_m'] - before_row['vx_m'])
-                    vy = before_row['vy_m'] + t * (after_row['vy_m'] - before_row['vy_m'])
-                    
-                    # Create physics row for extrapolation
-                    physics_row = {
-                        'vx_m': vx,
-                        'vy_m': vy,
-                        'cx_m': cx,
-                        'cy_m': cy
-                    }
-                    
-                    if frame not in extrapolated_data:
-                        extrapolated_data[frame] = {}
-                    
-                    extrapolated_data[frame][track_id] = {
-                        'cx': cx * 50.0,  # Convert back to pixels
-                        'cy': cy * 50.0,  # Convert back to pixels
-                        'physics': physics_row
-                    }
+        # Frames inside the track's range with no detection
+        frames = track_data['frame'].to_numpy()
+        missing = np.setdiff1d(np.arange(frames[0], frames[-1] + 1), frames)
+        if missing.size == 0:
+            continue
+        
+        # Nearest detections on either side of each missing frame
+        after = np.searchsorted(frames, missing, side='right')
+        before = after - 1
+        
+        # Linear interpolation of position and velocity for all missing frames at once
+        t = (missing - frames[before]) / (frames[after] - frames[before])
+        values = track_data[columns].to_numpy(dtype=np.float64)
+        interpolated = values[before] + t[:, None] * (values[after] - values[before])
+        
+        for frame, (cx, cy, vx, vy) in zip(missing.tolist(), interpolated.tolist()):
+            extrapolated_data.setdefault(frame, {})[track_id] = {
+                'cx': cx * 50.0,  # Convert back to pixels
+                'cy': cy * 50.0,  # Convert back to pixels
+                'physics': PhysicsVec(vx, vy)
+            }
     
     return extrapolated_data
 
@@ -280,21 +350,105 @@ def draw_vector_legend(frame, width, height):
     cv2.putText(frame, "Green: Gravity", (legend_x, legend_y + 55), 
                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
 
+def render_vector_legend(width, height):
+    """
+    Pre-render the vector legend for stamping onto frames
+    
+    Returns the legend's bounding box (y0, y1, x0, x1), its pixels and a mask of the
+    pixels draw_vector_legend actually touches.
+    """
+    # Pixels the legend draws come out the same on any background; everything else differs
+    on_black = np.zeros((height, width, 3), dtype=np.uint8)
+    on_white = np.full((height, width, 3), 255, dtype=np.uint8)
+    draw_vector_legend(on_black, width, height)
+    draw_vector_legend(on_white, width, height)
+    drawn = np.all(on_black == on_white, axis=2)
+    
+    rows = np.flatnonzero(drawn.any(axis=1))
+    cols = np.flatnonzero(drawn.any(axis=0))
+    if rows.size == 0:
+        return 0, 0, 0, 0, on_black[:0, :0], drawn[:0, :0, None]
+    y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    return y0, y1, x0, x1, on_black[y0:y1, x0:x1].copy(), drawn[y0:y1, x0:x1, None]
+
+# Track colors (BGR), cycled by track ID
+TRACK_COLORS = (
+    (255, 0, 0),    # Red
+    (0, 255, 0),    # Green
+    (0, 0, 255),    # Blue
+    (255, 255, 0),  # Cyan
+    (255, 0, 255),  # Magenta
+    (0, 255, 255),  # Yellow
+    (128, 0, 128),  # Purple
+    (255, 165, 0),  # Orange
+    (0, 128, 0),    # Dark Green
+    (128, 128, 0),  # Olive
+)
+
 def get_track_color(track_id):
     """Generate consistent colors for track IDs"""
-    colors = [
-        (255, 0, 0),    # Red
-        (0, 255, 0),    # Green
-        (0, 0, 255),    # Blue
-        (255, 255, 0),  # Cyan
-        (255, 0, 255),  # Magenta
-        (0, 255, 255),  # Yellow
-        (128, 0, 128),  # Purple
-        (255, 165, 0),  # Orange
-        (0, 128, 0),    # Dark Green
-        (128, 128, 0),  # Olive
-    ]
-    return colors[track_id % len(colors)]
+    return TRACK_COLORS[track_id % len(TRACK_COLORS)]
+
+@lru_cache(maxsize=1024)
+def get_label_size(label):
+    """Size of a detection label; labels repeat across frames, so measure each once"""
+    return cv2.getTextSize(label, LABEL_FONT, LABEL_SCALE, LABEL_THICKNESS)[0]
+
+def prefetch_frames(cap, maxsize):
+    """
+    Yield frames from cap, decoded on a background thread so reads overlap inference.
+    
+    Closing the generator (or exhausting it) stops and joins the reader, so the caller
+    can release cap afterwards without the reader still using it.
+    """
+    frames = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    
+    def reader():
+        while not stop.is_set():
+            ok, frame = cap.read()
+            item = frame if ok else None
+            while not stop.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            if not ok:
+                break
+    
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break
+            yield frame
+    finally:
+        stop.set()
+        thread.join()
+
+def write_frames_async(out, maxsize):
+    """Write frames put on the returned queue to out from a background thread (None ends it)"""
+    frames = queue.Queue(maxsize=maxsize)
+    
+    def writer():
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break
+            if encoder.error is None:
+                try:
+                    out.write(frame)
+                except Exception as e:
+                    # Keep draining so the producer never blocks; re-raised after join()
+                    encoder.error = e
+    
+    encoder = threading.Thread(target=writer, daemon=True)
+    encoder.error = None
+    encoder.start()
+    return frames, encoder
 
 def process_video_with_tracking(input_video_path, output_dir="static/videos"):
     """
@@ -302,7 +456,8 @@ def process_video_with_tracking(input_video_path, output_dir="static/videos"):
     """
     os.makedirs(output_dir, exist_ok=True)
     
-    # Load YOLO model
+    # Load YOLO model (ultralytics/torch are only imported when tracking actually runs)
+    from ultralytics import YOLO
     model = YOLO('yolov8n.pt')
     name_to_id = {v: k for k, v in model.names.items()}
     TARGET = name_to_id.get("sports ball")
@@ -323,85 +478,104 @@ def process_video_with_tracking(input_video_path, output_dir="static/videos"):
     IOU = 0.7   # Higher IoU for better tracking
     IMGZ = 640  # Smaller image size for faster processing
     
-    # Data collection
-    data = []
+    # Data collection: per-frame NumPy arrays for each column, concatenated at the end
+    data = {column: [] for column in TRACKING_COLUMNS}
+    detections = 0
     frame_idx = 0
     
-    print("Starting object tracking...")
+    # Frames sent to the model per forward pass
+    BATCH = 8
     
-    while True:
-        ok, frame = cap.read()
-        if not ok:
-            break
-        
-        frame_idx += 1
-        t_sec = frame_idx / fps
-        
-        # Run tracking with multiple object classes
-        target_classes = [TARGET] if TARGET is not None else [0, 1, 2, 3, 4, 5]  # Include common objects
-        
-        results = model.track(
-            frame,
-            persist=True,
-            tracker=tracker_cfg,
-            conf=CONF,
-            iou=IOU,
-            imgsz=IMGZ,
-            classes=target_classes,
-            verbose=False
-        )
-        
-        r = results[0]
-        
-        # Collect tracking data - collect all detected objects
-        if r.boxes is not None and len(r.boxes):
-            boxes = r.boxes
-            for i in range(len(boxes)):
-                cls_id = int(boxes.cls[i])
-                # Collect all objects, not just sports ball
-                track_id = int(boxes.id[i]) if boxes.id is not None else -1
-                conf = float(boxes.conf[i])
-                x1, y1, x2, y2 = map(float, boxes.xyxy[i].tolist())
-                cx, cy = (x1 + x2) / 2.0, (y1 + y2) / 2.0
-                
-                data.append([
-                    frame_idx, t_sec, track_id, cls_id, model.names[cls_id],
-                    conf, x1, y1, x2, y2, cx, cy
-                ])
-        
-        # Progress update
-        if frame_idx % 30 == 0:
-            print(f"Tracked {frame_idx} frames, {len(data)} detections")
+    # Run tracking with multiple object classes
+    target_classes = [TARGET] if TARGET is not None else [0, 1, 2, 3, 4, 5]  # Include common objects
     
-    cap.release()
+    print("Starting object tracking...")
     
-    if not data:
+    frames = prefetch_frames(cap, maxsize=2 * BATCH)
+    try:
+        while True:
+            batch = list(islice(frames, BATCH))
+            if not batch:
+                break
+            
+            # With persist=True the tracker consumes the batch results in frame order
+            results = model.track(
+                batch,
+                persist=True,
+                tracker=tracker_cfg,
+                conf=CONF,
+                iou=IOU,
+                imgsz=IMGZ,
+                classes=target_classes,
+                verbose=False
+            )
+            
+            for r in results:
+                frame_idx += 1
+                t_sec = frame_idx / fps
+                
+                # Collect tracking data - collect all detected objects
+                if r.boxes is not None and len(r.boxes):
+                    boxes = r.boxes
+                    # Move each tensor to the CPU once per frame instead of once per detection
+                    cls_ids = boxes.cls.cpu().numpy().astype(np.int32)
+                    n = len(cls_ids)
+                    track_ids = boxes.id.cpu().numpy().astype(np.int32) if boxes.id is not None else np.full(n, -1, dtype=np.int32)
+                    confs = boxes.conf.cpu().numpy().astype(np.float64)
+                    xyxy = boxes.xyxy.cpu().numpy().astype(np.float64)
+                    
+                    # Collect all objects, not just sports ball
+                    frame_columns = {
+                        'frame': np.full(n, frame_idx, dtype=np.int32),
+                        'time_s': np.full(n, t_sec),
+                        'track_id': track_ids,
+                        'class_id': cls_ids,
+                        'class_name': np.array([model.names[c] for c in cls_ids.tolist()], dtype=object),
+                        'conf': confs,
+                        'x1': xyxy[:, 0],
+                        'y1': xyxy[:, 1],
+                        'x2': xyxy[:, 2],
+                        'y2': xyxy[:, 3],
+                        'cx': (xyxy[:, 0] + xyxy[:, 2]) / 2.0,
+                        'cy': (xyxy[:, 1] + xyxy[:, 3]) / 2.0
+                    }
+                    for column, values in frame_columns.items():
+                        data[column].append(values)
+                    detections += n
+                
+                # Progress update
+                if frame_idx % 30 == 0:
+                    print(f"Tracked {frame_idx} frames, {detections} detections")
+    finally:
+        # Stop the reader before the capture is released underneath it
+        frames.close()
+        cap.release()
+    
+    if not detections:
         raise ValueError("No objects detected in video")
     
-    # Save tracking data
+    # Save tracking data (typed columns, no per-row object inference)
     csv_path = os.path.join(output_dir, "tracking_data.csv")
-    df = pd.DataFrame(data, columns=[
-        'frame', 'time_s', 'track_id', 'class_id', 'class_name', 'conf',
-        'x1', 'y1', 'x2', 'y2', 'cx', 'cy'
-    ])
+    df = pd.DataFrame({column: np.concatenate(chunks) for column, chunks in data.items()})
     df.to_csv(csv_path, index=False)
     
     # Create tracking video
     video_name = os.path.basename(input_video_path)
     output_video_path = os.path.join(output_dir, f"tracked_{video_name}")
     
-    create_tracking_video(input_video_path, output_video_path, csv_path)
+    create_tracking_video(input_video_path, output_video_path, df)
     
     print(f"✅ Tracking complete!")
-    print(f"📊 {len(data)} detections saved to: {csv_path}")
+    print(f"📊 {detections} detections saved to: {csv_path}")
     print(f"🎥 Tracking video saved to: {output_video_path}")
     
-    return csv_path, output_video_path
+    # Return the DataFrame too so callers don't re-parse the CSV
+    return csv_path, output_video_path, df
 
 if __name__ == "__main__":
     # Test with ball-in.mp4
     input_video = "./assets/ball-in.mp4"
     if os.path.exists(input_video):
-        csv_path, video_path = process_video_with_tracking(input_video)
+        csv_path, video_path, _ = process_video_with_tracking(input_video)
     else:
         print(f"Video not found: {input_video}")
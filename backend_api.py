@@ -9,12 +9,19 @@ from flask_cors import CORS
 import os
 import tempfile
 import json
-import subprocess
+import gzip
+import queue
+import shutil
+import threading
+import time
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Dict, Any, List, Tuple
 import uuid
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, Future
 
 app = Flask(__name__)
 CORS(app, resources={
@@ -29,6 +36,18 @@ CORS(app, resources={
 UPLOAD_FOLDER = 'uploads'
 RESULTS_FOLDER = 'results'
 ALLOWED_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'wmv', 'flv'}
+DEFAULT_VIDEO_INFO = {'width': 1920, 'height': 1080, 'fps': 30}
+
+# Schema of the results Parquet file; positions and times stay float64 for the trajectory output
+RESULT_SCHEMA = pa.schema([
+    ('frame', pa.int32()), ('time_s', pa.float64()), ('track_id', pa.int32()),
+    ('class_id', pa.int16()), ('class_name', pa.string()), ('conf', pa.float32()),
+    ('x1', pa.float32()), ('y1', pa.float32()), ('x2', pa.float32()), ('y2', pa.float32()),
+    ('cx', pa.float64()), ('cy', pa.float64())
+])
+
+# Frames of detections buffered per Parquet row group
+ROW_GROUP_FRAMES = 256
 
 # Ensure directories exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -37,194 +56,301 @@ os.makedirs(RESULTS_FOLDER, exist_ok=True)
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def run_analysis(video_path: str, config: Dict[str, Any]) -> str:
-    """Run the tracking analysis on the uploaded video."""
-    
-    # Generate unique result filename
-    result_id = str(uuid.uuid4())
-    result_csv = os.path.join(RESULTS_FOLDER, f"{result_id}_data.csv")
-    
-    # Create temporary analysis script
-    analysis_script = f"""
-from ultralytics import YOLO
-import cv2, csv
-import pandas as pd
-import numpy as np
-
-# Configuration
-model = YOLO('yolov8n.pt')
-video_path = '{video_path}'
-result_csv = '{result_csv}'
-
-# Analysis parameters
-CONF = {config.get('confidence', 0.15)}
-IOU = {config.get('iouThreshold', 0.5)}
-IMGZ = {config.get('inputSize', 960)}
-TARGET = {config.get('objectClass', 32)}
-
-# Load video
-cap = cv2.VideoCapture(video_path)
-fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-
-data = []
-frame_idx = 0
+# YOLO model, loaded once on first use and shared by all requests
+_model = None
+_model_device = 'cpu'
+_model_lock = threading.Lock()
 
-while True:
-    ok, frame = cap.read()
-    if not ok:
-        break
-    frame_idx += 1
-    t_sec = frame_idx / fps
+# Input size of the warm-up inference (the frontend's default inputSize)
+WARMUP_IMGSZ = 960
 
-    # Run tracking
-    results = model.track(
-        frame,
-        persist=True,
-        tracker="bytetrack.yaml",
-        conf=CONF,
-        iou=IOU,
-        imgsz=IMGZ,
-        classes=[TARGET] if TARGET is not None else None,
-        verbose=False
-    )
+def get_model():
+    """Return the shared YOLO model, loading the weights on first call (on the GPU when available)."""
+    global _model, _model_device
+    with _model_lock:
+        if _model is None:
+            import torch
+            from ultralytics import YOLO
+            _model_device = 0 if torch.cuda.is_available() else 'cpu'
+            _model = YOLO('yolov8n.pt')
+            _model.to(_model_device)
+            # Warm-up pass so layer fusion and CUDA setup aren't paid by the first request
+            _model.predict(np.zeros((WARMUP_IMGSZ, WARMUP_IMGSZ, 3), dtype=np.uint8), imgsz=WARMUP_IMGSZ,
+                           device=_model_device, half=_model_device != 'cpu', verbose=False)
+        return _model
 
-    r = results[0]
-
-    # Collect data
-    if r.boxes is not None and len(r.boxes):
-        boxes = r.boxes
-        for i in range(len(boxes)):
-            cls_id = int(boxes.cls[i])
-            if TARGET is not None and cls_id != TARGET:
-                continue
-            track_id = int(boxes.id[i]) if boxes.id is not None else -1
-            conf = float(boxes.conf[i])
-            x1, y1, x2, y2 = map(float, boxes.xyxy[i].tolist())
-            cx, cy = (x1 + x2) / 2.0, (y1 + y2) / 2.0
+# Analysis jobs run on worker threads; JOBS maps job ids to their futures. A finished job is
+# dropped once its result has been collected, or JOB_TTL seconds after finishing if never polled.
+EXECUTOR = ThreadPoolExecutor(max_workers=2)
+JOBS: Dict[str, Future] = {}
+JOB_TTL = 15 * 60
 
-            data.append([
-                frame_idx, t_sec, track_id, cls_id, 'sports ball',
-                conf, x1, y1, x2, y2, cx, cy
-            ])
+def evict_expired_jobs() -> None:
+    """Drop finished jobs nobody collected within JOB_TTL, releasing their results."""
+    now = time.monotonic()
+    for job_id, future in list(JOBS.items()):
+        if future.done() and now - getattr(future, 'finished_at', now) > JOB_TTL:
+            JOBS.pop(job_id, None)
 
-cap.release()
+# ByteTrack state lives on the shared model, so only one video is tracked at a time
+_track_lock = threading.Lock()
 
-# Save raw data
-with open(result_csv, 'w', newline='') as f:
-    w = csv.writer(f)
-    w.writerow([
-        'frame','time_s','track_id','class_id','class_name','conf',
-        'x1','y1','x2','y2','cx','cy'
-    ])
-    w.writerows(data)
+# Frames per inference batch, and frames/results buffered between pipeline stages
+TRACK_BATCH = 8
+PREFETCH = 16
 
-print(f"Analysis complete: {{len(data)}} detections saved to {{result_csv}}")
-"""
+def run_analysis(video_path: str, config: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Run the tracking analysis on the uploaded video and return (Parquet path, video info)."""
+    import cv2
     
-    # Write and execute analysis script
-    script_path = os.path.join(RESULTS_FOLDER, f"{result_id}_analysis.py")
-    with open(script_path, 'w') as f:
-        f.write(analysis_script)
+    # Generate unique result filename
+    result_id = str(uuid.uuid4())
+    result_path = os.path.join(RESULTS_FOLDER, f"{result_id}_data.parquet")
     
-    try:
-        # Run analysis
-        result = subprocess.run(
-            ['python', script_path],
-            capture_output=True,
-            text=True,
-            cwd=os.getcwd()
-        )
+    # Analysis parameters
+    CONF = float(config.get('confidence', 0.15))
+    IOU = float(config.get('iouThreshold', 0.5))
+    IMGZ = int(config.get('inputSize', 960))
+    TARGET = config.get('objectClass', 32)
+    TARGET = int(TARGET) if TARGET is not None else None
+    STRIDE = max(1, int(config.get('frameStride', 1)))  # track every STRIDE-th frame
+    
+    model = get_model()
+    
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    
+    # Video properties for the frontend, read from the capture already open for tracking
+    if cap.isOpened():
+        video_info = {
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': cap.get(cv2.CAP_PROP_FPS),
+            'frameCount': int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        }
+    else:
+        video_info = dict(DEFAULT_VIDEO_INFO)
+    
+    # Detections are written as columnar record batches while frames are tracked
+    writer = pq.ParquetWriter(result_path, RESULT_SCHEMA)
+    pending = []
+    detections = 0
+    
+    # Three-stage pipeline: reader thread -> tracking (this thread) -> collector thread,
+    # joined by bounded queues; None marks the end of each stream
+    frames = queue.Queue(maxsize=PREFETCH)
+    tracked = queue.Queue(maxsize=PREFETCH)
+    stop = threading.Event()  # set when tracking ends, so the reader never waits on a dead consumer
+    collect_error = None
+    
+    def put_frame(item):
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def reader():
+        # Skipped frames are only grabbed (demuxed), never decoded into pixels
+        frame_idx = 0
+        try:
+            while not stop.is_set() and cap.grab():
+                frame_idx += 1
+                if frame_idx % STRIDE:
+                    continue
+                ok, frame = cap.retrieve()
+                if not ok or not put_frame((frame_idx, frame)):
+                    break
+        finally:
+            put_frame(None)
+    
+    def collector():
+        nonlocal collect_error
+        while True:
+            item = tracked.get()
+            if item is None:
+                break
+            if collect_error is not None:
+                continue  # Keep draining so tracking never blocks; re-raised after join()
+            try:
+                collect(*item)
+            except Exception as e:
+                collect_error = e
         
-        if result.returncode != 0:
-            raise Exception(f"Analysis failed: {result.stderr}")
+        if pending and collect_error is None:
+            try:
+                writer.write_table(pa.Table.from_batches(pending, schema=RESULT_SCHEMA))
+            except Exception as e:
+                collect_error = e
+    
+    def collect(frame_idx, r):
+        nonlocal detections
+        t_sec = frame_idx / fps
+        if r.boxes is None or not len(r.boxes):
+            return
         
-        # Clean up script
-        os.remove(script_path)
+        # Collect data: each tensor is moved to the CPU once per frame
+        boxes = r.boxes
+        cls_ids = boxes.cls.cpu().numpy().astype(int)
+        n = len(cls_ids)
+        track_ids = boxes.id.cpu().numpy().astype(int) if boxes.id is not None else np.full(n, -1)
+        confs = boxes.conf.cpu().numpy().astype(np.float64)
+        xyxy = boxes.xyxy.cpu().numpy().astype(np.float64)
         
-        return result_csv
+        if TARGET is not None:
+            keep = cls_ids == TARGET
+            cls_ids, track_ids, confs, xyxy = cls_ids[keep], track_ids[keep], confs[keep], xyxy[keep]
+            n = len(cls_ids)
+        if not n:
+            return
         
-    except Exception as e:
-        # Clean up on error
-        if os.path.exists(script_path):
-            os.remove(script_path)
-        raise e
+        pending.append(pa.RecordBatch.from_arrays([
+            pa.array(np.full(n, frame_idx, dtype=np.int32)),
+            pa.array(np.full(n, t_sec)),
+            pa.array(track_ids.astype(np.int32)),
+            pa.array(cls_ids.astype(np.int16)),
+            pa.array(['sports ball'] * n, type=pa.string()),
+            pa.array(confs.astype(np.float32)),
+            pa.array(xyxy[:, 0].astype(np.float32)),
+            pa.array(xyxy[:, 1].astype(np.float32)),
+            pa.array(xyxy[:, 2].astype(np.float32)),
+            pa.array(xyxy[:, 3].astype(np.float32)),
+            pa.array((xyxy[:, 0] + xyxy[:, 2]) / 2.0),
+            pa.array((xyxy[:, 1] + xyxy[:, 3]) / 2.0)
+        ], schema=RESULT_SCHEMA))
+        detections += n
+        if len(pending) >= ROW_GROUP_FRAMES:
+            writer.write_table(pa.Table.from_batches(pending, schema=RESULT_SCHEMA))
+            pending.clear()
+    
+    read_thread = threading.Thread(target=reader, daemon=True)
+    read_thread.start()
+    collect_thread = threading.Thread(target=collector, daemon=True)
+    collect_thread.start()
+    
+    try:
+        # The tracker only ever runs on this thread, so ByteTrack state needs no extra locking
+        with _track_lock:
+            # Start each video with a fresh ByteTrack: ultralytics rebuilds the trackers when the
+            # predictor has none. Batches are list sources (image0..imageN), so persist must stay
+            # True throughout or the tracker would be reset on every frame of a batch.
+            if getattr(model, 'predictor', None) is not None and hasattr(model.predictor, 'trackers'):
+                del model.predictor.trackers
+            done = False
+            while not done and collect_error is None:
+                batch = []
+                while len(batch) < TRACK_BATCH:
+                    item = frames.get()
+                    if item is None:
+                        done = True
+                        break
+                    batch.append(item)
+                if not batch:
+                    break
+                
+                results = model.track(
+                    [frame for _, frame in batch],
+                    persist=True,
+                    tracker="bytetrack.yaml",
+                    conf=CONF,
+                    iou=IOU,
+                    imgsz=IMGZ,
+                    classes=[TARGET] if TARGET is not None else None,
+                    device=_model_device,
+                    half=_model_device != 'cpu',  # FP16 inference on CUDA
+                    verbose=False
+                )
+                # Frame numbers stay absolute, so t_sec is unaffected by the stride
+                for (frame_idx, _), r in zip(batch, results):
+                    tracked.put((frame_idx, r))
+    finally:
+        # Unblock and join both stages before the capture is released underneath the reader
+        stop.set()
+        tracked.put(None)
+        collect_thread.join()
+        read_thread.join()
+        cap.release()
+        writer.close()
+    if collect_error is not None:
+        raise collect_error
+    
+    print(f"Analysis complete: {detections} detections saved to {result_path}")
+    
+    return result_path, video_info
 
-def process_analysis_results(csv_path: str, video_path: str = None) -> Dict[str, Any]:
-    """Process the CSV results and return formatted data for frontend."""
+def export_csv(result_path: str) -> str:
+    """Write the CSV (and a gzip copy) for a results Parquet file, once, and return its path."""
+    csv_path = result_path[:-len('.parquet')] + '.csv'
+    if not os.path.exists(csv_path):
+        df = pq.read_table(result_path).to_pandas()
+        # Write under unique temporary names so concurrent downloads never see a partial file
+        part = f"{csv_path}.{uuid.uuid4().hex}.part"
+        df.to_csv(part, index=False)
+        with open(part, 'rb') as src, gzip.open(part + '.gz', 'wb', compresslevel=3) as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(part + '.gz', csv_path + '.gz')
+        os.replace(part, csv_path)
+    return csv_path
+
+def process_analysis_results(result_path: str, video_info: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Process the Parquet results and return formatted data for frontend."""
     
-    # Read the CSV data
-    df = pd.read_csv(csv_path)
+    # Read the tracking data (typed columns, no parsing)
+    df = pq.read_table(result_path).to_pandas()
     
     if len(df) == 0:
         return {
             'error': 'No tracking data found'
         }
     
-    # Get video dimensions if video path is provided
-    video_info = {}
-    if video_path and os.path.exists(video_path):
-        try:
-            import cv2
-            cap = cv2.VideoCapture(video_path)
-            if cap.isOpened():
-                video_info = {
-                    'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-                    'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-                    'fps': cap.get(cv2.CAP_PROP_FPS),
-                    'frameCount': int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                }
-                cap.release()
-        except Exception as e:
-            print(f"Warning: Could not get video info: {e}")
-            # Default dimensions
-            video_info = {'width': 1920, 'height': 1080, 'fps': 30}
-    else:
-        # Default dimensions
-        video_info = {'width': 1920, 'height': 1080, 'fps': 30}
-    
-    # Calculate velocities
-    df = df.sort_values('frame').reset_index(drop=True)
-    df['vx'] = df['cx'].diff()
-    df['vy'] = df['cy'].diff()
-    df['velocity'] = np.sqrt(df['vx']**2 + df['vy']**2)
-    
-    # Calculate accelerations
-    df['ax'] = df['vx'].diff()
-    df['ay'] = df['vy'].diff()
-    df['acceleration'] = np.sqrt(df['ax']**2 + df['ay']**2)
-    
-    # Convert to trajectory points
-    trajectory = []
-    for _, row in df.iterrows():
-        trajectory.append({
-            'frame': int(row['frame']),
-            'time': float(row['time_s']),
-            'x': float(row['cx']),
-            'y': float(row['cy']),
-            'vx': float(row['vx']) if not pd.isna(row['vx']) else 0,
-            'vy': float(row['vy']) if not pd.isna(row['vy']) else 0,
-            'velocity': float(row['velocity']) if not pd.isna(row['velocity']) else 0,
-            'confidence': float(row['conf']),
-            'trackId': int(row['track_id'])
-        })
-    
-    # Calculate statistics
-    fps = len(df) / df['time_s'].max() if df['time_s'].max() > 0 else 0
+    # Video dimensions come from run_analysis; fall back to defaults when unknown
+    if not video_info:
+        video_info = dict(DEFAULT_VIDEO_INFO)
+    
+    # Calculate velocities and accelerations within each track, so interleaved tracks
+    # never difference against each other (each track's first differences are 0)
+    df = df.sort_values('frame', kind='mergesort').reset_index(drop=True)
+    df[['vx', 'vy']] = df.groupby('track_id', sort=False)[['cx', 'cy']].diff().fillna(0.0).to_numpy()
+    df[['ax', 'ay']] = df.groupby('track_id', sort=False)[['vx', 'vy']].diff().fillna(0.0).to_numpy()
+    df['velocity'] = np.hypot(df['vx'], df['vy'])
+    df['acceleration'] = np.hypot(df['ax'], df['ay'])
+    
+    # Convert to trajectory points (whole columns at once rather than row by row)
+    trajectory = pd.DataFrame({
+        'frame': df['frame'].astype(int),
+        'time': df['time_s'].astype(float),
+        'x': df['cx'].astype(float),
+        'y': df['cy'].astype(float),
+        'vx': df['vx'],
+        'vy': df['vy'],
+        'velocity': df['velocity'],
+        'confidence': df['conf'].astype(float),
+        'trackId': df['track_id'].astype(int)
+    }).to_dict(orient='records')
+    
+    # Calculate statistics: one aggregation over the columns instead of a scan per value
+    agg = df[['velocity', 'acceleration', 'cx', 'cy', 'conf']].agg(['sum', 'min', 'max', 'mean'])
+    
+    # Sorted by frame, so the last timestamp is the duration
+    duration = float(df['time_s'].iat[-1])
+    fps = len(df) / duration if duration > 0 else 0
     
     statistics = {
-        'totalDistance': float(df['velocity'].sum()),
-        'maxVelocity': float(df['velocity'].max()) if not df['velocity'].isna().all() else 0,
-        'avgVelocity': float(df['velocity'].mean()) if not df['velocity'].isna().all() else 0,
-        'maxAcceleration': float(df['acceleration'].max()) if not df['acceleration'].isna().all() else 0,
-        'avgAcceleration': float(df['acceleration'].mean()) if not df['acceleration'].isna().all() else 0,
-        'xRange': [float(df['cx'].min()), float(df['cx'].max())],
-        'yRange': [float(df['cy'].min()), float(df['cy'].max())]
+        'totalDistance': float(agg.at['sum', 'velocity']),
+        'maxVelocity': float(agg.at['max', 'velocity']),
+        'avgVelocity': float(agg.at['mean', 'velocity']),
+        'maxAcceleration': float(agg.at['max', 'acceleration']),
+        'avgAcceleration': float(agg.at['mean', 'acceleration']),
+        'xRange': [float(agg.at['min', 'cx']), float(agg.at['max', 'cx'])],
+        'yRange': [float(agg.at['min', 'cy']), float(agg.at['max', 'cy'])]
     }
     
     confidence_stats = {
-        'min': float(df['conf'].min()),
-        'max': float(df['conf'].max()),
-        'average': float(df['conf'].mean())
+        'min': float(agg.at['min', 'conf']),
+        'max': float(agg.at['max', 'conf']),
+        'average': float(agg.at['mean', 'conf'])
     }
     
     # Get unique track IDs
@@ -232,7 +358,7 @@ def process_analysis_results(csv_path: str, video_path: str = None) -> Dict[str,
     
     return {
         'frames': len(df),
-        'duration': float(df['time_s'].max()),
+        'duration': duration,
         'fps': fps,
         'trajectory': trajectory,
         'statistics': statistics,
@@ -241,9 +367,41 @@ def process_analysis_results(csv_path: str, video_path: str = None) -> Dict[str,
         'videoInfo': video_info
     }
 
+def analyze_job(video_path: str, filename: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyze a saved upload, store its metadata and return the frontend data."""
+    try:
+        # Run analysis
+        result_path, video_info = run_analysis(video_path, config)
+        
+        # Process results
+        analysis_data = process_analysis_results(result_path, video_info)
+        
+        if 'error' in analysis_data:
+            return analysis_data
+        
+        # Store result metadata
+        metadata = {
+            'result_id': os.path.basename(result_path).split('_')[0],
+            'video_filename': filename,
+            'config': config,
+            'timestamp': datetime.now().isoformat(),
+            'data_path': result_path
+        }
+        
+        metadata_file = os.path.join(RESULTS_FOLDER, f"{metadata['result_id']}_metadata.json")
+        with open(metadata_file, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        
+        return analysis_data
+        
+    finally:
+        # Clean up uploaded video
+        if os.path.exists(video_path):
+            os.remove(video_path)
+
 @app.route('/api/analyze', methods=['POST', 'OPTIONS'])
 def analyze_video():
-    """Analyze uploaded video and return tracking results."""
+    """Start analysis of an uploaded video and return its job id."""
     
     # Handle preflight OPTIONS request
     if request.method == 'OPTIONS':
@@ -280,49 +438,65 @@ def analyze_video():
         video_path = os.path.join(UPLOAD_FOLDER, filename)
         file.save(video_path)
         
-        try:
-            # Run analysis
-            result_csv = run_analysis(video_path, config)
-            
-            # Process results
-            analysis_data = process_analysis_results(result_csv, video_path)
-            
-            if 'error' in analysis_data:
-                return jsonify(analysis_data), 400
-            
-            # Store result metadata
-            metadata = {
-                'result_id': os.path.basename(result_csv).split('_')[0],
-                'video_filename': filename,
-                'config': config,
-                'timestamp': datetime.now().isoformat(),
-                'csv_path': result_csv
-            }
-            
-            metadata_file = os.path.join(RESULTS_FOLDER, f"{metadata['result_id']}_metadata.json")
-            with open(metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            
-            return jsonify(analysis_data)
-            
-        finally:
-            # Clean up uploaded video
-            if os.path.exists(video_path):
-                os.remove(video_path)
+        # Run the analysis on a worker thread; the client polls /api/jobs/<job_id>
+        evict_expired_jobs()
+        job_id = str(uuid.uuid4())
+        future = EXECUTOR.submit(analyze_job, video_path, filename, config)
+        future.add_done_callback(lambda f: setattr(f, 'finished_at', time.monotonic()))
+        JOBS[job_id] = future
+        
+        return jsonify({'job_id': job_id}), 202
                 
     except Exception as e:
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report the status of an analysis job, with its results once done."""
+    
+    future = JOBS.get(job_id)
+    if future is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if not future.done():
+        return jsonify({'status': 'pending'})
+    
+    # The result is handed over once; keeping the future would hold it in memory forever
+    JOBS.pop(job_id, None)
+    
+    error = future.exception()
+    if error is not None:
+        return jsonify({'status': 'error', 'error': f'Analysis failed: {str(error)}'})
+    
+    analysis_data = future.result()
+    if 'error' in analysis_data:
+        return jsonify({'status': 'error', 'error': analysis_data['error']})
+    
+    return jsonify({'status': 'done', 'result': analysis_data})
+
 @app.route('/api/download/<result_id>', methods=['GET'])
 def download_results(result_id):
     """Download CSV results for a specific analysis."""
     
-    csv_path = os.path.join(RESULTS_FOLDER, f"{result_id}_data.csv")
+    result_path = os.path.join(RESULTS_FOLDER, f"{result_id}_data.parquet")
     
-    if not os.path.exists(csv_path):
+    if not os.path.exists(result_path):
         return jsonify({'error': 'Results not found'}), 404
     
-    return send_file(csv_path, as_attachment=True, download_name=f'analysis_{result_id}.csv')
+    # Results are stored as Parquet; the CSV export is converted on first download
+    csv_path = export_csv(result_path)
+    
+    # conditional=True lets the server answer Range/If-None-Match and hand the file to sendfile
+    gz_path = csv_path + '.gz'
+    if 'gzip' in request.headers.get('Accept-Encoding', '') and os.path.exists(gz_path):
+        response = send_file(gz_path, mimetype='text/csv', as_attachment=True,
+                             download_name=f'analysis_{result_id}.csv', conditional=True)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = send_file(csv_path, mimetype='text/csv', as_attachment=True,
+                             download_name=f'analysis_{result_id}.csv', conditional=True)
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -353,10 +527,18 @@ def get_object_classes():
 if __name__ == '__main__':
     print("Starting ImpulseCV Backend API...")
     print("Available endpoints:")
-    print("  POST /api/analyze - Analyze uploaded video")
+    print("  POST /api/analyze - Start analysis of an uploaded video")
+    print("  GET  /api/jobs/<job_id> - Analysis job status and results")
     print("  GET  /api/download/<result_id> - Download CSV results")
     print("  GET  /api/health - Health check")
     print("  GET  /api/classes - Get object classes")
     print("\nMake sure yolov8n.pt is in the current directory")
     
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    debug = True
+    
+    # Load and warm up the model before accepting requests. With the debug reloader this
+    # module runs in both the watcher and the serving child; only the child needs the model
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        get_model()
+    
+    app.run(host='0.0.0.0', port=5001, debug=debug)
@@ -8,9 +8,22 @@ import cv2
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import torch
 from ultralytics import YOLO
 from physics_engine import PhysicsEngine
 import os
+import queue
+import threading
+
+# Frames per tracker call, and frames/results buffered between pipeline stages
+BATCH = 16
+PREFETCH = 32
+
+# Columns of the tracking CSV, in order
+COLUMNS = [
+    'frame', 'time_s', 'track_id', 'class_id', 'class_name',
+    'conf', 'x1', 'y1', 'x2', 'y2', 'cx', 'cy'
+]
 
 def run_simple_demo():
     """Run a simple demo of ImpulseCV functionality"""
@@ -19,8 +32,10 @@ def run_simple_demo():
     
     # Initialize model
     print("🤖 Loading YOLO model...")
+    device = 0 if torch.cuda.is_available() else 'cpu'
     model = YOLO('yolov8n.pt')
-    print("✅ Model loaded!")
+    model.to(device)
+    print(f"✅ Model loaded! (device: {'cuda' if device != 'cpu' else 'cpu'})")
     
     # Check for video files
     video_files = []
@@ -45,62 +60,132 @@ def run_simple_demo():
     fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     
-    data = []
-    frame_idx = 0
-    
-    while True:
-        ok, frame = cap.read()
-        if not ok:
-            break
-        
-        frame_idx += 1
+    # Per-frame NumPy arrays for each column, concatenated once tracking finishes
+    class_names = np.array([model.names[i] for i in range(len(model.names))], dtype=object)
+    data = {column: [] for column in COLUMNS}
+    detections = 0
+    
+    # Reader thread decodes frames, this thread runs the tracker, a collector thread
+    # turns results into rows; bounded queues with a None end marker connect them
+    frames = queue.Queue(maxsize=PREFETCH)
+    tracked = queue.Queue(maxsize=PREFETCH)
+    stop = threading.Event()  # set when tracking ends, so the reader never waits on a dead consumer
+    collect_error = None
+    
+    def put_frame(item):
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def reader():
+        try:
+            while not stop.is_set():
+                ok, frame = cap.read()
+                if not ok or not put_frame(frame):
+                    break
+        finally:
+            put_frame(None)
+    
+    def collector():
+        nonlocal collect_error
+        while True:
+            item = tracked.get()
+            if item is None:
+                break
+            if collect_error is not None:
+                continue  # Keep draining so tracking never blocks; re-raised after join()
+            try:
+                collect(*item)
+            except Exception as e:
+                collect_error = e
+    
+    def collect(frame_idx, r):
+        nonlocal detections
         t_sec = frame_idx / fps
         
-        # Progress indicator
-        if frame_idx % 10 == 0:
-            progress = (frame_idx / total_frames) * 100
-            print(f"   Progress: {progress:.1f}% ({frame_idx}/{total_frames} frames)")
-        
-        # Run tracking
-        results = model.track(
-            frame,
-            persist=True,
-            tracker="bytetrack.yaml",
-            conf=0.15,
-            iou=0.5,
-            imgsz=960,
-            verbose=False
-        )
-        
-        r = results[0]
-        
-        # Collect data
+        # Collect data: pull each tensor to NumPy once and build the columns as arrays
         if r.boxes is not None and len(r.boxes):
             boxes = r.boxes
-            for i in range(len(boxes)):
-                cls_id = int(boxes.cls[i])
-                track_id = int(boxes.id[i]) if boxes.id is not None else -1
-                conf = float(boxes.conf[i])
-                x1, y1, x2, y2 = map(float, boxes.xyxy[i].tolist())
-                cx, cy = (x1 + x2) / 2.0, (y1 + y2) / 2.0
-                
-                data.append([
-                    frame_idx, t_sec, track_id, cls_id, model.names[cls_id],
-                    conf, x1, y1, x2, y2, cx, cy
-                ])
-    
-    cap.release()
-    print(f"✅ Processing complete! {len(data)} data points collected")
+            cls_ids = boxes.cls.cpu().numpy().astype(int)
+            n = len(cls_ids)
+            xyxy = boxes.xyxy.cpu().numpy().astype(np.float64)
+            frame_columns = {
+                'frame': np.full(n, frame_idx),
+                'time_s': np.full(n, t_sec),
+                'track_id': boxes.id.cpu().numpy().astype(int) if boxes.id is not None else np.full(n, -1),
+                'class_id': cls_ids,
+                'class_name': class_names[cls_ids],
+                'conf': boxes.conf.cpu().numpy().astype(np.float64),
+                'x1': xyxy[:, 0],
+                'y1': xyxy[:, 1],
+                'x2': xyxy[:, 2],
+                'y2': xyxy[:, 3],
+                'cx': 0.5 * (xyxy[:, 0] + xyxy[:, 2]),
+                'cy': 0.5 * (xyxy[:, 1] + xyxy[:, 3])
+            }
+            for column, values in frame_columns.items():
+                data[column].append(values)
+            detections += n
+    
+    read_thread = threading.Thread(target=reader, daemon=True)
+    read_thread.start()
+    collect_thread = threading.Thread(target=collector, daemon=True)
+    collect_thread.start()
     
-    if len(data) == 0:
+    try:
+        frame_idx = 0
+        done = False
+        while not done and collect_error is None:
+            batch = []
+            while len(batch) < BATCH:
+                frame = frames.get()
+                if frame is None:
+                    done = True
+                    break
+                batch.append(frame)
+            if not batch:
+                break
+            
+            results = model.track(
+                batch,
+                persist=True,
+                tracker="bytetrack.yaml",
+                conf=0.15,
+                iou=0.5,
+                imgsz=960,
+                device=device,
+                half=device != 'cpu',  # FP16 inference on CUDA
+                verbose=False
+            )
+            for r in results:
+                frame_idx += 1
+                tracked.put((frame_idx, r))
+                
+                # Progress indicator
+                if frame_idx % 10 == 0:
+                    progress = (frame_idx / total_frames) * 100
+                    print(f"   Progress: {progress:.1f}% ({frame_idx}/{total_frames} frames)")
+    finally:
+        stop.set()
+        tracked.put(None)
+        collect_thread.join()
+        read_thread.join()
+        cap.release()
+    if collect_error is not None:
+        raise collect_error
+    
+    print(f"✅ Processing complete! {detections} data points collected")
+    
+    if detections == 0:
         print("❌ No objects detected in video")
         return
     
     # Create DataFrame
-    df = pd.DataFrame(data, columns=[
-        'frame', 'time_s', 'track_id', 'class_id', 'class_name',
-        'conf', 'x1', 'y1', 'x2', 'y2', 'cx', 'cy'
-    ])
+    df = pd.DataFrame({column: np.concatenate(values) for column, values in data.items()})
     
     # Calculate physics
     print("🧮 Calculating physics metrics...")
@@ -114,7 +199,7 @@ def run_simple_demo():
     # Display results
     print("\n📊 ANALYSIS RESULTS")
     print("=" * 40)
-    print(f"📈 Data Points: {len(data)}")
+    print(f"📈 Data Points: {detections}")
     print(f"⏱️  Duration: {trajectory_analysis['duration']:.2f} seconds")
     print(f"📏 Distance: {trajectory_analysis['total_distance']:.2f} meters")
     print(f"🏃 Max Speed: {trajectory_analysis['max_speed']:.2f} m/s")
@@ -46,7 +46,24 @@ function App() {
         throw new Error(`Analysis failed: ${response.status} ${response.statusText}`);
       }
       
-      const data = await response.json();
+      // The backend analyzes in the background; poll the job until it finishes
+      const { job_id } = await response.json();
+      let data;
+      while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const jobResponse = await fetch(`http://localhost:5001/api/jobs/${job_id}`);
+        if (!jobResponse.ok) {
+          throw new Error(`Job status failed: ${jobResponse.status} ${jobResponse.statusText}`);
+        }
+        const job = await jobResponse.json();
+        if (job.status === 'done') {
+          data = job.result;
+          break;
+        }
+        if (job.status === 'error') {
+          throw new Error(job.error);
+        }
+      }
       console.log('Analysis data received:', data);
       setAnalysisData(data);
       setAnalysisStatus('completed');
@@ -3,11 +3,144 @@ Advanced Physics Engine for ImpulseCV
 Calculates velocity, acceleration, forces, energy, and other physics metrics
 """
 
+import functools
+import threading
 import numpy as np
 import pandas as pd
 from scipy import signal
+from scipy.ndimage import convolve1d
 from scipy.interpolate import interp1d
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to a vectorized NumPy gradient
+    njit = None
+
+# Columns added by PhysicsEngine.calculate_physics_metrics. They are computed in float64
+# (velocities/accelerations are differences, which float32 would swamp) and stored as
+# float32, which halves the frame for every later pass
+PHYSICS_COLUMNS = ('cx_m', 'cy_m', 'vx_m', 'vy_m', 'ax_m', 'ay_m', 'speed_m', 'acceleration_m',
+                   'kinetic_energy', 'momentum_x', 'momentum_y', 'momentum_magnitude',
+                   'force_x', 'force_y', 'force_magnitude', 'potential_energy', 'total_energy',
+                   'work_done', 'power',
+                   'cx_m_smooth', 'cy_m_smooth', 'vx_m_smooth', 'vy_m_smooth', 'ax_m_smooth', 'ay_m_smooth')
+PHYSICS_DTYPE = np.float32
+
+# Columns smooth_data derives a *_smooth version of, its default Savitzky-Golay window
+# and highest polynomial order, and the shortest track calculate_physics_metrics smooths
+# (shorter tracks carry the raw values in the *_smooth columns)
+SMOOTHED_COLUMNS = ('cx_m', 'cy_m', 'vx_m', 'vy_m', 'ax_m', 'ay_m')
+SMOOTH_WINDOW = 5
+SMOOTH_MAX_POLYORDER = 3
+SMOOTH_MIN_ROWS = SMOOTH_WINDOW
+
+def _gradient_loop(y, x, out):
+    """Finite-difference dy/dx into out: one-sided at the ends, central inside, 0 where dx == 0"""
+    n = y.shape[0]
+    # Ends: forward/backward two-point differences
+    dx = x[1] - x[0]
+    out[0] = (y[1] - y[0]) / dx if dx != 0 else 0.0
+    dx = x[n - 1] - x[n - 2]
+    out[n - 1] = (y[n - 1] - y[n - 2]) / dx if dx != 0 else 0.0
+    # Interior: central differences, subtraction/division/zero-guard in one pass
+    for i in range(1, n - 1):
+        dx = x[i + 1] - x[i - 1]
+        out[i] = (y[i + 1] - y[i - 1]) / dx if dx != 0 else 0.0
+    return out
+
+def _gradient_numpy(y, x, out):
+    """NumPy equivalent of _gradient_loop, used when numba is unavailable"""
+    n = y.shape[0]
+    idx = np.arange(n)
+    lo = np.maximum(idx - 1, 0)
+    hi = np.minimum(idx + 1, n - 1)
+    dx = x[hi] - x[lo]
+    dy = y[hi] - y[lo]
+    out[:] = 0.0
+    np.divide(dy, dx, out=out, where=dx != 0)
+    return out
+
+# No fastmath: NaN positions must keep propagating into the gradient. No parallel:
+# trajectories are short enough that thread start-up would dominate
+_gradient = njit(cache=True, nogil=True)(_gradient_loop) if njit else _gradient_numpy
+
+def _step_diff(a):
+    """a[i] - a[i-1] with NaN at i == 0, like Series.diff"""
+    out = np.empty_like(a)
+    out[0] = np.nan
+    np.subtract(a[1:], a[:-1], out=out[1:])
+    return out
+
+@functools.lru_cache(maxsize=16)
+def _savgol_kernels(window_length, polyorder):
+    """
+    Savitzky-Golay weights for a fixed (window_length, polyorder), derived once
+    
+    Returns:
+        (coeffs, head): the interior convolution coefficients, and the
+        (window_length // 2, window_length) weights that evaluate the polynomial fitted
+        to the first window at its first samples (savgol_filter's mode='interp' edges)
+    """
+    coeffs = signal.savgol_coeffs(window_length, polyorder)
+    half = window_length // 2
+    fit = np.linalg.pinv(np.vander(np.arange(window_length, dtype=np.float64), polyorder + 1))
+    head = np.vander(np.arange(half, dtype=np.float64), polyorder + 1) @ fit
+    return coeffs, head
+
+def _savgol(a, window_length, polyorder):
+    """savgol_filter(a, window_length, polyorder) from the cached weights"""
+    coeffs, head = _savgol_kernels(window_length, polyorder)
+    half = window_length // 2
+    out = convolve1d(a, coeffs, mode='constant')
+    if half:
+        # Edges from the fitted end windows; the last window mirrors the first. Like
+        # savgol_filter's edge fit, refuse non-finite end windows (smooth_data falls back)
+        if not (np.isfinite(a[:window_length]).all() and np.isfinite(a[-window_length:]).all()):
+            raise ValueError("array must not contain infs or NaNs")
+        out[:half] = head @ a[:window_length]
+        out[-half:] = head[::-1, ::-1] @ a[-window_length:]
+    return out
+
+@functools.lru_cache(maxsize=4)
+def _quadratic_r2(xy_bytes):
+    """
+    R² of the least-squares quadratic y(x), cached by the raw (x, y) bytes so the
+    analysis and insights passes over the same trajectory fit it once
+    
+    Args:
+        xy_bytes: C-order float64 bytes of an (n, 2) array of x, y
+    """
+    xy = np.frombuffer(xy_bytes, dtype=np.float64).reshape(-1, 2)
+    x, y = xy[:, 0], xy[:, 1]
+    
+    # One Vandermonde for both the fit and the prediction; x is centred and scaled
+    # first (same fitted curve, but well conditioned, like np.polyfit's column scaling)
+    u = x - x.mean()
+    scale = np.abs(u).max()
+    if scale > 0:
+        u = u / scale
+    V = np.stack([u * u, u, np.ones_like(u)], axis=1)
+    coeffs, *_ = np.linalg.lstsq(V, y, rcond=None)
+    residual = y - V @ coeffs
+    centred = y - y.mean()
+    return 1 - (residual @ residual) / (centred @ centred)
+
+# Advanced-plot figures, one set per thread (matplotlib figures must not be shared
+# across threads); reused across calls so the Agg canvas is only set up once
+_FIG_POOL = threading.local()
+
+def _advanced_figures():
+    """This thread's (physics figure, its 2x2 axes, phase-space figure, its axes)"""
+    if getattr(_FIG_POOL, 'figures', None) is None:
+        # Figure + Agg canvas directly: no pyplot figure registry, no GUI backend
+        physics_fig = Figure(figsize=(12, 8))
+        FigureCanvasAgg(physics_fig)
+        phase_fig = Figure(figsize=(10, 6))
+        FigureCanvasAgg(phase_fig)
+        _FIG_POOL.figures = (physics_fig, physics_fig.subplots(2, 2), phase_fig, phase_fig.subplots())
+    return _FIG_POOL.figures
 
 class PhysicsEngine:
     def __init__(self, pixels_per_meter=1.0, object_mass=1.0, gravity=9.81):
@@ -23,6 +156,10 @@ class PhysicsEngine:
         self.object_mass = object_mass
         self.gravity = gravity
         
+        # (df, verdict) of the last detect_projectile_motion call, so analyze_trajectory
+        # and calculate_physics_insights on the same frame only decide once
+        self._projectile_cache = (None, None)
+        
     def calculate_physics_metrics(self, df):
         """
         Calculate comprehensive physics metrics from tracking data
@@ -33,65 +170,95 @@ class PhysicsEngine:
         Returns:
             Enhanced DataFrame with physics calculations
         """
+        # A new frame is produced below; drop the verdict cached for the previous one
+        self._projectile_cache = (None, None)
+        
         if len(df) < 2:
-            return df
+            # Nothing to difference: positions pass through, every derived quantity is 0
+            # (what the full pass yields after the NaN fill), so the columns stay stable
+            cx_m = df['cx'].to_numpy(dtype=np.float64) / self.pixels_per_meter
+            cy_m = df['cy'].to_numpy(dtype=np.float64) / self.pixels_per_meter
+            columns = dict.fromkeys(PHYSICS_COLUMNS, 0.0)
+            columns.update(cx_m=cx_m, cy_m=cy_m, cx_m_smooth=cx_m, cy_m_smooth=cy_m)
+            return df.assign(**columns).astype(dict.fromkeys(PHYSICS_COLUMNS, PHYSICS_DTYPE), copy=False)
             
         # Sort by time
         df = df.sort_values('time_s').reset_index(drop=True)
         
-        # Convert to meters
-        df['cx_m'] = df['cx'] / self.pixels_per_meter
-        df['cy_m'] = df['cy'] / self.pixels_per_meter
-        
-        # Calculate velocity (m/s) with safe division
-        time_diff = df['time_s'].diff()
-        df['vx_m'] = df['cx_m'].diff() / time_diff.replace(0, np.nan)
-        df['vy_m'] = df['cy_m'].diff() / time_diff.replace(0, np.nan)
-        
-        # Calculate acceleration (m/s²) with safe division
-        df['ax_m'] = df['vx_m'].diff() / time_diff.replace(0, np.nan)
-        df['ay_m'] = df['vy_m'].diff() / time_diff.replace(0, np.nan)
+        # All per-frame quantities in one NumPy block over the raw columns
+        t = df['time_s'].to_numpy(dtype=np.float64)
         
-        # Calculate magnitude quantities (handle infinite values)
-        df['speed_m'] = np.sqrt(np.nan_to_num(df['vx_m']**2) + np.nan_to_num(df['vy_m']**2))
-        df['acceleration_m'] = np.sqrt(np.nan_to_num(df['ax_m']**2) + np.nan_to_num(df['ay_m']**2))
-        
-        # Calculate kinetic energy (J) - handle infinite values
-        df['kinetic_energy'] = 0.5 * self.object_mass * np.nan_to_num(df['speed_m']**2)
-        
-        # Calculate momentum (kg⋅m/s) - handle infinite values
-        df['momentum_x'] = self.object_mass * np.nan_to_num(df['vx_m'])
-        df['momentum_y'] = self.object_mass * np.nan_to_num(df['vy_m'])
-        df['momentum_magnitude'] = self.object_mass * np.nan_to_num(df['speed_m'])
-        
-        # Calculate forces (N) - handle infinite values
-        df['force_x'] = self.object_mass * np.nan_to_num(df['ax_m'])
-        df['force_y'] = self.object_mass * np.nan_to_num(df['ay_m'])
-        df['force_magnitude'] = self.object_mass * np.nan_to_num(df['acceleration_m'])
-        
-        # Calculate potential energy (J) - assuming ground is at bottom of frame
-        max_height = df['cy_m'].max()
-        df['potential_energy'] = self.object_mass * self.gravity * (max_height - df['cy_m'])
-        
-        # Calculate total energy (J)
-        df['total_energy'] = df['kinetic_energy'] + df['potential_energy']
-        
-        # Calculate work done (J)
-        df['work_done'] = df['total_energy'].diff()
-        
-        # Calculate power (W) - handle infinite values
-        time_diff_power = df['time_s'].diff().replace(0, np.nan)
-        df['power'] = df['work_done'] / time_diff_power
-        
-        # Smooth the data using Savitzky-Golay filter
-        df = self.smooth_data(df)
-        
-        # Fill NaN values
-        df = df.fillna(0)
-        
-        return df
+        # Convert to meters
+        cx_m = df['cx'].to_numpy(dtype=np.float64) / self.pixels_per_meter
+        cy_m = df['cy'].to_numpy(dtype=np.float64) / self.pixels_per_meter
+        
+        # Time steps with repeated timestamps as NaN (safe division), computed once
+        dt = _step_diff(t)
+        dt[dt == 0] = np.nan
+        
+        # Calculate velocity (m/s) and acceleration (m/s²)
+        vx = _step_diff(cx_m) / dt
+        vy = _step_diff(cy_m) / dt
+        ax = _step_diff(vx) / dt
+        ay = _step_diff(vy) / dt
+        
+        # NaN/inf-cleaned components, made once and shared by magnitudes, momenta and forces
+        vx_clean = np.nan_to_num(vx)
+        vy_clean = np.nan_to_num(vy)
+        ax_clean = np.nan_to_num(ax)
+        ay_clean = np.nan_to_num(ay)
+        
+        # Calculate magnitude quantities (hypot: one pass, no overflow in the squares)
+        speed = np.hypot(vx_clean, vy_clean)
+        acceleration = np.hypot(ax_clean, ay_clean)
+        
+        # Kinetic energy (J)
+        mass = self.object_mass
+        kinetic_energy = 0.5 * mass * (speed * speed)
+        
+        # Potential energy (J) - assuming ground is at bottom of frame
+        potential_energy = mass * self.gravity * (np.nanmax(cy_m) - cy_m)
+        total_energy = kinetic_energy + potential_energy
+        work_done = _step_diff(total_energy)
+        
+        # Attach every column in one step (same names and order as before)
+        df = df.assign(
+            cx_m=cx_m, cy_m=cy_m,
+            vx_m=vx, vy_m=vy,
+            ax_m=ax, ay_m=ay,
+            speed_m=speed, acceleration_m=acceleration,
+            kinetic_energy=kinetic_energy,
+            # Momentum (kg⋅m/s) and forces (N) - handle infinite values
+            momentum_x=mass * vx_clean,
+            momentum_y=mass * vy_clean,
+            momentum_magnitude=mass * speed,
+            force_x=mass * ax_clean,
+            force_y=mass * ay_clean,
+            force_magnitude=mass * acceleration,
+            potential_energy=potential_energy,
+            total_energy=total_energy,
+            # Work done (J) and power (W)
+            work_done=work_done,
+            power=work_done / dt,
+        )
+        
+        # Smooth the data using Savitzky-Golay filter; short tracks skip straight to the
+        # raw values, which is all smooth_data could give them
+        if len(df) >= SMOOTH_MIN_ROWS:
+            df = self.smooth_data(df)
+        else:
+            df = df.assign(**{f'{column}_smooth': df[column].to_numpy() for column in SMOOTHED_COLUMNS})
+        
+        # Fill NaN values of the physics columns only (first-row differences, repeated
+        # timestamps) and store them single-precision: one pass per column, inputs untouched
+        physics = {}
+        for column in PHYSICS_COLUMNS:
+            values = np.array(df[column].to_numpy(), dtype=PHYSICS_DTYPE)
+            values[np.isnan(values)] = 0
+            physics[column] = values
+        return df.assign(**physics)
     
-    def smooth_data(self, df, window_length=5):
+    def smooth_data(self, df, window_length=SMOOTH_WINDOW):
         """
         Apply Savitzky-Golay filter to smooth noisy data
         
@@ -105,33 +272,39 @@ class PhysicsEngine:
         if len(df) < window_length:
             return df
         
-        # Ensure window_length is odd and not larger than data length
-        if window_length % 2 == 0:
-            window_length += 1
+        # Ensure window_length is odd and not larger than data length (largest odd <= len)
+        window_length |= 1
         if window_length > len(df):
-            window_length = len(df) if len(df) % 2 == 1 else len(df) - 1
+            window_length = len(df) - 1 + len(df) % 2
+        polyorder = min(SMOOTH_MAX_POLYORDER, window_length - 1)
             
         try:
-            # Smooth position data
-            df['cx_m_smooth'] = signal.savgol_filter(df['cx_m'], window_length, min(3, window_length-1))
-            df['cy_m_smooth'] = signal.savgol_filter(df['cy_m'], window_length, min(3, window_length-1))
+            # Work on the raw arrays and attach all six columns in one step at the end
+            t = df['time_s'].to_numpy(dtype=np.float64)
+            
+            # Smooth position data (Savitzky-Golay weights are derived once per window size)
+            cx_smooth = _savgol(df['cx_m'].to_numpy(dtype=np.float64), window_length, polyorder)
+            cy_smooth = _savgol(df['cy_m'].to_numpy(dtype=np.float64), window_length, polyorder)
             
             # Recalculate velocity from smoothed position with safe gradient
-            df['vx_m_smooth'] = self.safe_gradient(df['cx_m_smooth'], df['time_s'])
-            df['vy_m_smooth'] = self.safe_gradient(df['cy_m_smooth'], df['time_s'])
+            vx_smooth = self.safe_gradient(cx_smooth, t)
+            vy_smooth = self.safe_gradient(cy_smooth, t)
             
             # Recalculate acceleration from smoothed velocity with safe gradient
-            df['ax_m_smooth'] = self.safe_gradient(df['vx_m_smooth'], df['time_s'])
-            df['ay_m_smooth'] = self.safe_gradient(df['vy_m_smooth'], df['time_s'])
+            smoothed = {
+                'cx_m_smooth': cx_smooth,
+                'cy_m_smooth': cy_smooth,
+                'vx_m_smooth': vx_smooth,
+                'vy_m_smooth': vy_smooth,
+                'ax_m_smooth': self.safe_gradient(vx_smooth, t),
+                'ay_m_smooth': self.safe_gradient(vy_smooth, t),
+            }
             
         except Exception as e:
             # Fallback to simple smoothing if Savitzky-Golay fails
-            df['cx_m_smooth'] = df['cx_m']
-            df['cy_m_smooth'] = df['cy_m']
-            df['vx_m_smooth'] = df['vx_m']
-            df['vy_m_smooth'] = df['vy_m']
-            df['ax_m_smooth'] = df['ax_m']
-            df['ay_m_smooth'] = df['ay_m']
+            smoothed = {f'{column}_smooth': df[column].to_numpy() for column in SMOOTHED_COLUMNS}
+        
+        df = df.assign(**smoothed)
         
         return df
     
@@ -146,6 +319,9 @@ class PhysicsEngine:
         Returns:
             Gradient array
         """
+        # Unwrap Series once so the checks and the kernel all see plain float64 arrays
+        y = np.asarray(y, dtype=np.float64)
+        x = np.asarray(x, dtype=np.float64)
         if len(y) < 2:
             return np.zeros_like(y)
         
@@ -154,31 +330,8 @@ class PhysicsEngine:
         if not np.any(mask):
             return np.zeros_like(y)
         
-        # Calculate gradient with finite difference
-        gradient = np.zeros_like(y, dtype=float)
-        
-        for i in range(len(y)):
-            if i == 0:
-                # Forward difference
-                if len(y) > 1:
-                    dx = x[1] - x[0]
-                    dy = y[1] - y[0]
-                    if dx != 0:
-                        gradient[i] = dy / dx
-            elif i == len(y) - 1:
-                # Backward difference
-                dx = x[i] - x[i-1]
-                dy = y[i] - y[i-1]
-                if dx != 0:
-                    gradient[i] = dy / dx
-            else:
-                # Central difference
-                dx = x[i+1] - x[i-1]
-                dy = y[i+1] - y[i-1]
-                if dx != 0:
-                    gradient[i] = dy / dx
-        
-        return gradient
+        # Finite differences over contiguous raw arrays (compiled loop when numba is available)
+        return _gradient(np.ascontiguousarray(y), np.ascontiguousarray(x), np.empty_like(y))
     
     def analyze_trajectory(self, df):
         """
@@ -192,27 +345,34 @@ class PhysicsEngine:
         """
         analysis = {}
         
+        # Reduce in float64 (the stored columns are float32) so the results stay
+        # accurate and JSON-serializable
+        cx = df['cx_m'].to_numpy(dtype=np.float64)
+        cy = df['cy_m'].to_numpy(dtype=np.float64)
+        
         # Basic trajectory info
-        analysis['total_distance'] = np.sum(np.sqrt(np.diff(df['cx_m'])**2 + np.diff(df['cy_m'])**2))
-        analysis['max_height'] = df['cy_m'].max()
-        analysis['min_height'] = df['cy_m'].min()
-        analysis['horizontal_range'] = df['cx_m'].max() - df['cx_m'].min()
+        analysis['total_distance'] = np.sum(np.hypot(np.diff(cx), np.diff(cy)))
+        analysis['max_height'] = np.nanmax(cy)
+        analysis['min_height'] = np.nanmin(cy)
+        analysis['horizontal_range'] = np.nanmax(cx) - np.nanmin(cx)
         analysis['duration'] = df['time_s'].max() - df['time_s'].min()
         
-        # Velocity analysis (handle infinite values)
-        analysis['max_speed'] = np.nanmax(np.nan_to_num(df['speed_m']))
-        analysis['avg_speed'] = np.nanmean(np.nan_to_num(df['speed_m']))
-        analysis['max_velocity_x'] = np.nanmax(np.nan_to_num(df['vx_m']))
-        analysis['max_velocity_y'] = np.nanmax(np.nan_to_num(df['vy_m']))
+        # Velocity analysis (handle infinite values; nan_to_num on one array each)
+        speed = np.nan_to_num(df['speed_m'].to_numpy(dtype=np.float64))
+        analysis['max_speed'] = np.nanmax(speed)
+        analysis['avg_speed'] = np.nanmean(speed)
+        analysis['max_velocity_x'] = np.nanmax(np.nan_to_num(df['vx_m'].to_numpy(dtype=np.float64)))
+        analysis['max_velocity_y'] = np.nanmax(np.nan_to_num(df['vy_m'].to_numpy(dtype=np.float64)))
         
         # Acceleration analysis (handle infinite values)
-        analysis['max_acceleration'] = np.nanmax(np.nan_to_num(df['acceleration_m']))
-        analysis['avg_acceleration'] = np.nanmean(np.nan_to_num(df['acceleration_m']))
+        acceleration = np.nan_to_num(df['acceleration_m'].to_numpy(dtype=np.float64))
+        analysis['max_acceleration'] = np.nanmax(acceleration)
+        analysis['avg_acceleration'] = np.nanmean(acceleration)
         
         # Energy analysis
-        analysis['max_kinetic_energy'] = df['kinetic_energy'].max()
-        analysis['max_potential_energy'] = df['potential_energy'].max()
-        analysis['energy_conservation_error'] = np.std(df['total_energy'])
+        analysis['max_kinetic_energy'] = np.nanmax(df['kinetic_energy'].to_numpy(dtype=np.float64))
+        analysis['max_potential_energy'] = np.nanmax(df['potential_energy'].to_numpy(dtype=np.float64))
+        analysis['energy_conservation_error'] = np.std(df['total_energy'].to_numpy(dtype=np.float64))
         
         # Check for projectile motion
         analysis['is_projectile'] = self.detect_projectile_motion(df)
@@ -231,25 +391,22 @@ class PhysicsEngine:
         """
         if len(df) < 10:
             return False
-            
-        # Check for parabolic trajectory
-        x = df['cx_m'].values
-        y = df['cy_m'].values
-        
-        # Fit quadratic curve
-        coeffs = np.polyfit(x, y, 2)
         
-        # Calculate R²
-        y_pred = np.polyval(coeffs, x)
-        ss_res = np.sum((y - y_pred) ** 2)
-        ss_tot = np.sum((y - np.mean(y)) ** 2)
-        r_squared = 1 - (ss_res / ss_tot)
+        cached_df, verdict = self._projectile_cache
+        if cached_df is df:
+            return verdict
+            
+        # Check for parabolic trajectory: R² of a quadratic fit (cached per trajectory)
+        xy = df[['cx_m', 'cy_m']].to_numpy(dtype=np.float64)
+        r_squared = _quadratic_r2(np.ascontiguousarray(xy).tobytes())
         
         # Check if acceleration is roughly constant in y-direction
         y_acceleration = df['ay_m'].mean()
         acceleration_variance = np.var(df['ay_m'])
         
-        return r_squared > 0.8 and abs(y_acceleration + self.gravity) < 5 and acceleration_variance < 10
+        verdict = r_squared > 0.8 and abs(y_acceleration + self.gravity) < 5 and acceleration_variance < 10
+        self._projectile_cache = (df, verdict)
+        return verdict
     
     def calculate_physics_insights(self, df):
         """
@@ -311,64 +468,64 @@ class PhysicsEngine:
         
         plots = {}
         
+        # Reuse this thread's figures; the axes are cleared instead of rebuilt
+        physics_fig, axes, phase_fig, phase_ax = _advanced_figures()
+        for ax in (*axes.flat, phase_ax):
+            ax.cla()
+        
         # Energy plot
-        plt.figure(figsize=(12, 8))
-        
-        plt.subplot(2, 2, 1)
-        plt.plot(df['time_s'], df['kinetic_energy'], 'b-', label='Kinetic Energy', linewidth=2)
-        plt.plot(df['time_s'], df['potential_energy'], 'r-', label='Potential Energy', linewidth=2)
-        plt.plot(df['time_s'], df['total_energy'], 'g-', label='Total Energy', linewidth=2)
-        plt.xlabel('Time (s)')
-        plt.ylabel('Energy (J)')
-        plt.title('Energy Analysis')
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        
-        plt.subplot(2, 2, 2)
-        plt.plot(df['time_s'], df['force_magnitude'], 'purple', linewidth=2)
-        plt.xlabel('Time (s)')
-        plt.ylabel('Force (N)')
-        plt.title('Force Magnitude')
-        plt.grid(True, alpha=0.3)
-        
-        plt.subplot(2, 2, 3)
-        plt.plot(df['time_s'], df['power'], 'orange', linewidth=2)
-        plt.xlabel('Time (s)')
-        plt.ylabel('Power (W)')
-        plt.title('Power vs Time')
-        plt.grid(True, alpha=0.3)
-        
-        plt.subplot(2, 2, 4)
-        plt.plot(df['cx_m'], df['cy_m'], 'b-', linewidth=2, label='Trajectory')
-        plt.scatter(df['cx_m'].iloc[0], df['cy_m'].iloc[0], color='green', s=100, label='Start', zorder=5)
-        plt.scatter(df['cx_m'].iloc[-1], df['cy_m'].iloc[-1], color='red', s=100, label='End', zorder=5)
-        plt.xlabel('X Position (m)')
-        plt.ylabel('Y Position (m)')
-        plt.title('Trajectory in Real Units')
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.gca().invert_yaxis()
-        
-        plt.tight_layout()
+        ax = axes[0, 0]
+        ax.plot(df['time_s'], df['kinetic_energy'], 'b-', label='Kinetic Energy', linewidth=2)
+        ax.plot(df['time_s'], df['potential_energy'], 'r-', label='Potential Energy', linewidth=2)
+        ax.plot(df['time_s'], df['total_energy'], 'g-', label='Total Energy', linewidth=2)
+        ax.set_xlabel('Time (s)')
+        ax.set_ylabel('Energy (J)')
+        ax.set_title('Energy Analysis')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        
+        ax = axes[0, 1]
+        ax.plot(df['time_s'], df['force_magnitude'], 'purple', linewidth=2)
+        ax.set_xlabel('Time (s)')
+        ax.set_ylabel('Force (N)')
+        ax.set_title('Force Magnitude')
+        ax.grid(True, alpha=0.3)
+        
+        ax = axes[1, 0]
+        ax.plot(df['time_s'], df['power'], 'orange', linewidth=2)
+        ax.set_xlabel('Time (s)')
+        ax.set_ylabel('Power (W)')
+        ax.set_title('Power vs Time')
+        ax.grid(True, alpha=0.3)
+        
+        ax = axes[1, 1]
+        ax.plot(df['cx_m'], df['cy_m'], 'b-', linewidth=2, label='Trajectory')
+        ax.scatter(df['cx_m'].iloc[0], df['cy_m'].iloc[0], color='green', s=100, label='Start', zorder=5)
+        ax.scatter(df['cx_m'].iloc[-1], df['cy_m'].iloc[-1], color='red', s=100, label='End', zorder=5)
+        ax.set_xlabel('X Position (m)')
+        ax.set_ylabel('Y Position (m)')
+        ax.set_title('Trajectory in Real Units')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        ax.invert_yaxis()
+        
+        physics_fig.tight_layout()
         plot_path = os.path.join(output_dir, 'advanced_physics.png')
-        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-        plt.close()
+        physics_fig.savefig(plot_path, dpi=150, bbox_inches='tight')
         plots['advanced_physics'] = plot_path
         
         # Phase space plot
-        plt.figure(figsize=(10, 6))
-        plt.plot(df['cx_m'], df['vx_m'], 'b-', linewidth=2, label='X Phase Space')
-        plt.plot(df['cy_m'], df['vy_m'], 'r-', linewidth=2, label='Y Phase Space')
-        plt.xlabel('Position (m)')
-        plt.ylabel('Velocity (m/s)')
-        plt.title('Phase Space Plot')
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
+        phase_ax.plot(df['cx_m'], df['vx_m'], 'b-', linewidth=2, label='X Phase Space')
+        phase_ax.plot(df['cy_m'], df['vy_m'], 'r-', linewidth=2, label='Y Phase Space')
+        phase_ax.set_xlabel('Position (m)')
+        phase_ax.set_ylabel('Velocity (m/s)')
+        phase_ax.set_title('Phase Space Plot')
+        phase_ax.legend()
+        phase_ax.grid(True, alpha=0.3)
+        
+        phase_fig.tight_layout()
         plot_path = os.path.join(output_dir, 'phase_space.png')
-        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-        plt.close()
+        phase_fig.savefig(plot_path, dpi=150, bbox_inches='tight')
         plots['phase_space'] = plot_path
         
         return plots
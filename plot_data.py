@@ -6,6 +6,7 @@ Shows ball trajectory, position over time, and velocity analysis.
 
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import numpy as np
 import argparse
 import os
@@ -24,23 +25,57 @@ def load_and_clean_data(csv_file):
     
     return df
 
+# Frame rate assumed when the data can't tell us
+DEFAULT_FPS = 30.0
+
+# Most per-point markers drawn on a trajectory; the path itself is always complete
+MAX_MARKERS = 500
+
+def time_colored_path(df, ax, linewidth=2):
+    """Add the cx/cy path to ax as one LineCollection colored by time_s; returns it."""
+    points = np.column_stack([df['cx'].to_numpy(dtype=np.float64), df['cy'].to_numpy(dtype=np.float64)])
+    segments = np.stack([points[:-1], points[1:]], axis=1)
+    path = LineCollection(segments, cmap='viridis', linewidths=linewidth)
+    path.set_array(df['time_s'].to_numpy(dtype=np.float64)[:-1])
+    path.autoscale()  # fix the color range now, so marker scatters can share path.norm
+    ax.add_collection(path)
+    ax.autoscale_view()
+    return path
+
+def marker_sample(df):
+    """Every n-th row of df, so at most about MAX_MARKERS points get markers."""
+    return df.iloc[::max(1, len(df) // MAX_MARKERS)]
+
+def infer_fps(df):
+    """Frame rate from the frame/time_s columns (DEFAULT_FPS if they are missing or unusable)."""
+    if len(df) < 2 or 'frame' not in df.columns or 'time_s' not in df.columns:
+        return DEFAULT_FPS
+    frame_steps = np.diff(df['frame'].to_numpy(dtype=np.float64))
+    time_steps = np.diff(df['time_s'].to_numpy(dtype=np.float64))
+    valid = (frame_steps > 0) & (time_steps > 0)
+    if not valid.any():
+        return DEFAULT_FPS
+    return float(np.median(frame_steps[valid] / time_steps[valid]))
+
 def calculate_velocity(df):
     """Calculate velocity between consecutive frames."""
-    df = df.copy()
+    # Velocity in pixels per frame, straight from the position arrays
+    cx = df['cx'].to_numpy(dtype=np.float64)
+    cy = df['cy'].to_numpy(dtype=np.float64)
+    vx = np.empty_like(cx)
+    vy = np.empty_like(cy)
+    vx[:1] = np.nan
+    vy[:1] = np.nan
+    np.subtract(cx[1:], cx[:-1], out=vx[1:])
+    np.subtract(cy[1:], cy[:-1], out=vy[1:])
     
-    # Calculate velocity in pixels per frame
-    df['vx'] = df['cx'].diff()
-    df['vy'] = df['cy'].diff()
-    
-    # Calculate velocity magnitude
-    df['velocity'] = np.sqrt(df['vx']**2 + df['vy']**2)
-    
-    # Calculate velocity in pixels per second
-    df['vx_ps'] = df['vx'] * 30  # Assuming 30 FPS
-    df['vy_ps'] = df['vy'] * 30
-    df['velocity_ps'] = df['velocity'] * 30
+    # Velocity magnitude
+    velocity = np.hypot(vx, vy)
     
-    return df
+    # Velocity in pixels per second at the recording's frame rate
+    fps = infer_fps(df)
+    return df.assign(vx=vx, vy=vy, velocity=velocity,
+                     vx_ps=vx * fps, vy_ps=vy * fps, velocity_ps=velocity * fps)
 
 def plot_trajectory(df, title="Ball Trajectory"):
     """Plot the ball's trajectory in 2D space."""
@@ -49,9 +84,11 @@ def plot_trajectory(df, title="Ball Trajectory"):
     # Main trajectory plot
     plt.subplot(2, 2, 1)
     
-    # Color by time progression
-    scatter = plt.scatter(df['cx'], df['cy'], c=df['time_s'], cmap='viridis', 
-                         s=30, alpha=0.7, edgecolors='black', linewidth=0.5)
+    # Color by time progression: the whole path as one collection, markers on a sample
+    path = time_colored_path(df, plt.gca())
+    markers = marker_sample(df)
+    plt.scatter(markers['cx'], markers['cy'], c=markers['time_s'], cmap='viridis',
+                norm=path.norm, s=30, alpha=0.7, edgecolors='black', linewidth=0.5)
     
     # Add start and end markers
     if len(df) > 0:
@@ -63,7 +100,7 @@ def plot_trajectory(df, title="Ball Trajectory"):
     plt.title(title)
     plt.xlabel('X Position (pixels)')
     plt.ylabel('Y Position (pixels)')
-    plt.colorbar(scatter, label='Time (seconds)')
+    plt.colorbar(path, label='Time (seconds)')
     plt.legend()
     plt.grid(True, alpha=0.3)
     plt.axis('equal')  # Equal aspect ratio
@@ -125,9 +162,11 @@ def plot_velocity_vectors(df, sample_rate=5):
     
     plt.figure(figsize=(10, 8))
     
-    # Plot trajectory
-    plt.scatter(df['cx'], df['cy'], c=df['time_s'], cmap='viridis', 
-               s=20, alpha=0.6, label='Trajectory')
+    # Plot trajectory (one path collection plus sampled markers)
+    path = time_colored_path(df, plt.gca(), linewidth=1)
+    markers = marker_sample(df)
+    plt.scatter(markers['cx'], markers['cy'], c=markers['time_s'], cmap='viridis',
+                norm=path.norm, s=20, alpha=0.6, label='Trajectory')
     
     # Sample velocity vectors (every nth frame to avoid clutter)
     sample_df = df.iloc[::sample_rate]
@@ -194,29 +233,32 @@ def plot_track_analysis(df):
 
 def print_data_summary(df):
     """Print summary statistics of the tracking data."""
+    # Every per-column statistic in one aggregation
+    stats = df.agg({'time_s': ['min', 'max'], 'conf': ['min', 'max', 'mean'],
+                    'cx': ['min', 'max'], 'cy': ['min', 'max']})
+    duration = stats.at['max', 'time_s'] - stats.at['min', 'time_s']
+    
     print("\n=== Data Summary ===")
     print(f"Total frames: {len(df)}")
-    print(f"Duration: {df['time_s'].max() - df['time_s'].min():.3f} seconds")
-    print(f"Average FPS: {len(df) / (df['time_s'].max() - df['time_s'].min()):.1f}")
+    print(f"Duration: {duration:.3f} seconds")
+    print(f"Average FPS: {len(df) / duration:.1f}")
     
     if 'track_id' in df.columns:
-        unique_tracks = df['track_id'].nunique()
-        print(f"Unique track IDs: {unique_tracks}")
-        print(f"Track ID range: {df['track_id'].min()} to {df['track_id'].max()}")
+        tracks = df['track_id'].agg(['nunique', 'min', 'max'])
+        print(f"Unique track IDs: {tracks['nunique']}")
+        print(f"Track ID range: {tracks['min']} to {tracks['max']}")
     
-    print(f"Confidence range: {df['conf'].min():.3f} to {df['conf'].max():.3f}")
-    print(f"Average confidence: {df['conf'].mean():.3f}")
+    print(f"Confidence range: {stats.at['min', 'conf']:.3f} to {stats.at['max', 'conf']:.3f}")
+    print(f"Average confidence: {stats.at['mean', 'conf']:.3f}")
     
     # Position statistics
-    print(f"X position range: {df['cx'].min():.1f} to {df['cx'].max():.1f} pixels")
-    print(f"Y position range: {df['cy'].min():.1f} to {df['cy'].max():.1f} pixels")
+    print(f"X position range: {stats.at['min', 'cx']:.1f} to {stats.at['max', 'cx']:.1f} pixels")
+    print(f"Y position range: {stats.at['min', 'cy']:.1f} to {stats.at['max', 'cy']:.1f} pixels")
     
-    # Calculate total distance traveled
+    # Calculate total distance traveled (steps touching a missing position are skipped)
     if len(df) > 1:
-        dx = df['cx'].diff()
-        dy = df['cy'].diff()
-        distances = np.sqrt(dx**2 + dy**2)
-        total_distance = distances.sum()
+        distances = np.hypot(np.diff(df['cx'].to_numpy()), np.diff(df['cy'].to_numpy()))
+        total_distance = np.nansum(distances)
         print(f"Total distance traveled: {total_distance:.1f} pixels")
 
 def main():
@@ -2,12 +2,40 @@
 
 echo "🚀 Starting ImpulseCV Backend API..."
 echo "📁 Backend directory: $(pwd)/backend"
-echo "🐍 Python requirements: Installing..."
+echo "🐍 Python requirements: Checking..."
 
 cd backend
 
-# Install Python dependencies
-pip install -r requirements.txt
+# Install Python dependencies only when some are missing. Presence is read from the
+# installed package metadata, so nothing (torch, cv2, ...) is imported just to check.
+if python3 - requirements.txt <<'PY'
+import re
+import sys
+from importlib.metadata import distributions
+
+def normalize(name):
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+installed = {normalize(d.metadata['Name']) for d in distributions() if d.metadata['Name']}
+with open(sys.argv[1]) as f:
+    required = [re.split(r'[<>=!~;\[\s]', line.strip(), maxsplit=1)[0]
+                for line in f if line.strip() and not line.lstrip().startswith('#')]
+missing = [name for name in required if normalize(name) not in installed]
+for name in required:
+    print(f"   {'❌' if name in missing else '✅'} {name}")
+sys.exit(1 if missing else 0)
+PY
+then
+    echo "✅ All Python requirements already installed"
+else
+    echo "📦 Installing missing Python requirements..."
+    # Resolve PyPI once into a local wheelhouse; later installs stay on disk
+    export PIP_CACHE_DIR="${PIP_CACHE_DIR:-$HOME/.cache/impulsecv-pip}"
+    if [ ! -d wheelhouse ] || [ requirements.txt -nt wheelhouse ]; then
+        pip wheel --cache-dir "$PIP_CACHE_DIR" -w wheelhouse -r requirements.txt && touch wheelhouse
+    fi
+    pip install --no-index --find-links=wheelhouse -r requirements.txt
+fi
 
 # Create necessary directories
 mkdir -p assets static/videos static/plots